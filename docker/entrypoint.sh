@@ -15,6 +15,8 @@ if [ "$DEBUG" = "1" ]; then
   python manage.py flush --no-input
   python manage.py migrate
   exec "$@"
+elif [ "$#" -gt 0 ]; then
+  exec "$@"
 else
-  exec gunicorn --bind 0.0.0.0:8000 --workers 1 --threads 1 --timeout 0 "$SITENAME.wsgi:application"
+  exec gunicorn --config gunicorn.conf.py
 fi
@@ -5,6 +5,7 @@ source env/bin/activate
 pip install -r requirements.dev.txt
 pip install inquirer
 pip install GitPython
+pip install libcst
 cd ..
 clear
 python make/run.py
@@ -3,10 +3,12 @@
 # permissions and access rights.
 
 import json
+from functools import cache
 
 import pytest
 from allauth.account.models import EmailAddress
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AnonymousUser
 from django.test import Client
 from rest_framework.test import APIClient
@@ -15,14 +17,18 @@ from users.models import UserAccount
 password = "testpass123"
 
 
+@cache
+def hashed_password():
+    return make_password(password)
+
+
 def get_or_create_user(username: str, is_staff=False):
     email = f"{username}@testing.com"
-    user, created = UserAccount.objects.get_or_create(
-        username=username, email=email, defaults={"is_staff": is_staff}
+    user, _ = UserAccount.objects.get_or_create(
+        username=username,
+        email=email,
+        defaults={"is_staff": is_staff, "password": hashed_password()},
     )
-    if created:
-        user.set_password(password)
-        user.save()
     return user
 
 
@@ -34,6 +40,19 @@ def auth_client(client, user):
     return client
 
 
+def force_client(user):
+    client = APIClient()
+    client.force_login(user)
+    client.force_authenticate(user=user)
+    return client
+
+
+def force_browser(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
 @pytest.mark.django_db
 def verify_user(user):
     email_address, created = EmailAddress.objects.get_or_create(
@@ -87,22 +106,22 @@ def anon_client():
 
 
 @pytest.fixture
-def user_client(anon_client, verified_user):
-    client = auth_client(APIClient(), verified_user)
+def user_client(verified_user):
+    client = force_client(verified_user)
     yield client, verified_user
     client.logout()
 
 
 @pytest.fixture
-def other_client(anon_client, verified_other):
-    client = auth_client(APIClient(), verified_other)
+def other_client(verified_other):
+    client = force_client(verified_other)
     yield client, verified_other
     client.logout()
 
 
 @pytest.fixture
-def staff_client(anon_client, verified_staff):
-    client = auth_client(APIClient(), verified_staff)
+def staff_client(verified_staff):
+    client = force_client(verified_staff)
     yield client, verified_staff
     client.logout()
 
@@ -116,24 +135,21 @@ def anon_browser():
 @pytest.fixture
 @pytest.mark.django_db
 def user_browser(verified_user):
-    client = Client()
-    client.login(username=verified_user.username, password="testpass123")
+    client = force_browser(verified_user)
     return client, verified_user
 
 
 @pytest.fixture
 @pytest.mark.django_db
 def other_browser(verified_other):
-    client = Client()
-    client.login(username=verified_other.username, password="testpass123")
+    client = force_browser(verified_other)
     return client, verified_other
 
 
 @pytest.fixture
 @pytest.mark.django_db
 def staff_browser(verified_staff):
-    client = Client()
-    client.login(username=verified_staff.username, password="testpass123")
+    client = force_browser(verified_staff)
     return client, verified_staff
 
 
@@ -151,13 +167,5 @@ def get_user(request, anon, verified_user, verified_other, verified_staff):
 
 
 @pytest.fixture
-def get_client(request, anon_client, user_client, other_client, staff_client):
-    match request.param:
-        case "anon":
-            return anon_client
-        case "user":
-            return user_client
-        case "other":
-            return other_client
-        case "staff":
-            return staff_client
+def get_client(request, verified_user, verified_other, verified_staff):
+    return request.getfixturevalue(f"{request.param}_client")
@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+
+import prompts
+
+REQUIRED = ("project", "repository", "deployer")
+BOOLEANS = {
+    "true": True,
+    "yes": True,
+    "y": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "no": False,
+    "n": False,
+    "off": False,
+    "0": False,
+}
+
+
+def load(path: str):
+    if path == "-":
+        yield from parse_stream(sys.stdin)
+        return
+
+    with open(path) as file:
+        if path.endswith((".yml", ".yaml")):
+            yield from parse_yaml(file)
+        elif path.endswith(".jsonl"):
+            yield from parse_stream(file)
+        else:
+            yield from as_list(json.load(file))
+
+
+def parse_stream(lines):
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def parse_yaml(file):
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("Reading YAML answer files requires PyYAML.") from None
+
+    for document in yaml.safe_load_all(file):
+        yield from as_list(document)
+
+
+def as_list(document):
+    if document is None:
+        return []
+    return document if isinstance(document, list) else [document]
+
+
+def get_bool(answers: dict, key: str, default: bool):
+    value = answers.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (str, int)) and str(value).strip().lower() in BOOLEANS:
+        return BOOLEANS[str(value).strip().lower()]
+    raise ValueError(f"{key} must be true or false, not {value!r}.")
+
+
+def normalize(answers: dict):
+    missing = [key for key in REQUIRED if not answers.get(key)]
+    if missing:
+        raise ValueError(f"Answer set is missing {', '.join(missing)}.")
+
+    project = answers["project"]
+    if not prompts.is_valid_project(project):
+        msg = f"Project name {project!r} must be lowercase and contain no dashes."
+        raise ValueError(msg)
+
+    api_only = get_bool(answers, "api_only", False)
+    providers = [] if api_only else list(answers.get("providers", []))
+    unknown = sorted(set(providers) - set(prompts.PROVIDERS.values()))
+    if unknown:
+        raise ValueError(f"Unknown social auth providers: {', '.join(unknown)}.")
+
+    return {
+        "project": project,
+        "repository": answers["repository"],
+        "deployer": answers["deployer"],
+        "users": answers.get("users") or "users",
+        "api_only": api_only,
+        "providers": providers,
+        "fast_json": get_bool(answers, "fast_json", True),
+        "asgi": get_bool(answers, "asgi", False),
+        "pgbouncer": get_bool(answers, "pgbouncer", False),
+        "output": os.path.abspath(answers.get("output") or project),
+    }
@@ -0,0 +1,96 @@
+import io
+import json
+import os
+
+import answers
+import pytest
+
+answer_set = {"project": "myproject", "repository": "user/repo", "deployer": "ops"}
+
+
+class TestLoad:
+    def test_json_object(self, tmp_path):
+        path = tmp_path / "answers.json"
+        path.write_text(json.dumps(answer_set))
+        assert list(answers.load(str(path))) == [answer_set]
+
+    def test_json_list(self, tmp_path):
+        path = tmp_path / "answers.json"
+        path.write_text(json.dumps([answer_set, answer_set]))
+        assert list(answers.load(str(path))) == [answer_set, answer_set]
+
+    def test_json_lines(self, tmp_path):
+        path = tmp_path / "answers.jsonl"
+        path.write_text(json.dumps(answer_set) + "\n\n" + json.dumps(answer_set))
+        assert list(answers.load(str(path))) == [answer_set, answer_set]
+
+    def test_stdin(self, monkeypatch):
+        monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(answer_set) + "\n"))
+        assert list(answers.load("-")) == [answer_set]
+
+    def test_yaml_documents(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "answers.yml"
+        document = "project: myproject\nrepository: user/repo\ndeployer: ops\n"
+        path.write_text(document + "---\n" + document)
+        assert list(answers.load(str(path))) == [answer_set, answer_set]
+
+
+class TestNormalize:
+    def test_defaults(self):
+        actual = answers.normalize(answer_set)
+        assert actual["users"] == "users"
+        assert actual["api_only"] is False
+        assert actual["providers"] == []
+        assert actual["fast_json"] is True
+        assert actual["asgi"] is False
+        assert actual["pgbouncer"] is False
+
+    def test_output_defaults_to_project(self):
+        actual = answers.normalize(answer_set)
+        assert actual["output"] == os.path.abspath("myproject")
+
+    def test_output(self):
+        actual = answers.normalize({**answer_set, "output": "out/myproject"})
+        assert actual["output"] == os.path.abspath("out/myproject")
+
+    def test_providers(self):
+        actual = answers.normalize({**answer_set, "providers": ["github", "snap"]})
+        assert actual["providers"] == ["github", "snap"]
+
+    def test_api_only_skips_providers(self):
+        answer = {**answer_set, "api_only": True, "providers": ["github"]}
+        assert answers.normalize(answer)["providers"] == []
+
+    def test_asgi(self):
+        assert answers.normalize({**answer_set, "asgi": True})["asgi"] is True
+
+    def test_fast_json(self):
+        answer = {**answer_set, "fast_json": False}
+        assert answers.normalize(answer)["fast_json"] is False
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [("false", False), ("No", False), ("0", False), (0, False), ("yes", True)],
+    )
+    @pytest.mark.parametrize("key", ["api_only", "fast_json", "asgi", "pgbouncer"])
+    def test_booleans(self, key, value, expected):
+        assert answers.normalize({**answer_set, key: value})[key] is expected
+
+    @pytest.mark.parametrize("value", ["maybe", "", 2, ["yes"]])
+    def test_rejects_unknown_boolean(self, value):
+        with pytest.raises(ValueError, match="asgi"):
+            answers.normalize({**answer_set, "asgi": value})
+
+    @pytest.mark.parametrize("key", ["project", "repository", "deployer"])
+    def test_required(self, key):
+        with pytest.raises(ValueError, match=key):
+            answers.normalize({**answer_set, key: ""})
+
+    def test_rejects_invalid_project(self):
+        with pytest.raises(ValueError, match="lowercase"):
+            answers.normalize({**answer_set, "project": "My-Project"})
+
+    def test_rejects_unknown_provider(self):
+        with pytest.raises(ValueError, match="myspace"):
+            answers.normalize({**answer_set, "providers": ["myspace"]})
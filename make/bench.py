@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from timeit import repeat
+
+import files
+import settings
+
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", 20))
+MIN_DELTA = float(os.environ.get("BENCH_MIN_DELTA_MS", 0.1))
+SUITES = ["rewrite", "settings", "generate"]
+
+
+def make_text(patterns: int, lines: int = 2000):
+    words = [f"TOKEN_{i}" for i in range(patterns)]
+    return "\n".join(f"{words[i % patterns]} = value_{i}" for i in range(lines))
+
+
+def make_replacements(patterns: int):
+    return [(f"TOKEN_{i}", f"replaced_{i}") for i in range(patterns)]
+
+
+def sequential(contents: str, replacements):
+    for pattern, repl in replacements:
+        contents = re.sub(pattern, repl, contents)
+    return contents
+
+
+def time_call(func, *args, number: int = 5):
+    return min(repeat(lambda: func(*args), number=number, repeat=3)) / number
+
+
+def bench_rewrite(sizes=(1, 2, 4, 8, 16, 32, 64)):
+    results = {}
+    for size in sizes:
+        contents = make_text(size)
+        replacements = make_replacements(size)
+        single_pass = time_call(files.rewrite, contents, replacements)
+        results[f"rewrite/single_pass/{size}"] = single_pass
+        results[f"rewrite/sequential/{size}"] = time_call(
+            sequential, contents, replacements
+        )
+    return results
+
+
+def django_settings(project: str = "myproject"):
+    import django
+
+    template = os.path.join(
+        os.path.dirname(django.__file__),
+        "conf",
+        "project_template",
+        "project_name",
+        "settings.py-tpl",
+    )
+    with open(template) as file:
+        contents = file.read()
+
+    version = django.get_version()
+    context = {
+        "project_name": project,
+        "django_version": version,
+        "docs_version": ".".join(version.split(".")[:2]),
+        "secret_key": "django-insecure-benchmark",
+    }
+    return re.sub(r"{{ (\w+) }}", lambda match: context[match[1]], contents)
+
+
+def settings_transforms(users: str = "users", providers=("github", "google")):
+    providers = list(providers)
+    return {
+        "add_installed_apps": (settings.add_installed_apps, users, providers),
+        "change_database_settings": (settings.change_database_settings,),
+        "set_project_template_dir": (settings.set_project_template_dir,),
+        "add_new_settings": (settings.add_new_settings, users),
+        "add_import_os": (settings.add_import_os,),
+        "set_secret_key": (settings.set_secret_key,),
+        "set_debug": (settings.set_debug,),
+        "set_allowed_hosts": (settings.set_allowed_hosts,),
+        "add_rest_framework": (settings.add_rest_framework, users),
+        "add_authentication_backends": (settings.add_authentication_backends,),
+        "add_password_hashers": (settings.add_password_hashers, users),
+        "remove_password_validators": (settings.remove_password_validators,),
+        "add_social_auth_providers": (settings.add_social_auth_providers, providers),
+        "add_test_settings": (settings.add_test_settings,),
+        "transform_settings": (files.transform_settings, users, providers),
+    }
+
+
+def bench_settings(number: int = 5):
+    contents = django_settings()
+    results = {}
+    for name, (func, *args) in settings_transforms().items():
+        results[f"settings/{name}"] = time_call(func, contents, *args, number=number)
+    return results
+
+
+def bench_generate(rounds: int = 3, providers=("github", "google")):
+    import run
+    import staging
+
+    templates = staging.Templates(run.ROOT)
+    cwd = os.getcwd()
+    results = {}
+
+    for _ in range(rounds):
+        files.formatted_sources.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "myproject")
+            files.copy_starter(run.ROOT, output)
+            os.chdir(output)
+            try:
+                start = time.perf_counter()
+                steps, _ = run.generate(
+                    "myproject",
+                    "user/myproject",
+                    "deployer",
+                    "users",
+                    list(providers),
+                    False,
+                    templates=templates,
+                )
+                timings = {"generate/total": time.perf_counter() - start}
+            finally:
+                os.chdir(cwd)
+
+        for step in steps:
+            timings[f"generate/{step.name}"] = step.elapsed
+        for name, elapsed in timings.items():
+            results[name] = min(elapsed, results.get(name, elapsed))
+
+    return results
+
+
+def load_baseline(path: str):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(path: str, results: dict, merge: bool = True):
+    baseline = load_baseline(path) if merge else {}
+    baseline.update(results)
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def change(current: float, previous: float):
+    return (current - previous) / previous * 100 if previous else 0
+
+
+def is_regression(current: float, previous: float, threshold, min_delta):
+    slower = (current - previous) * 1000 > min_delta
+    return slower and change(current, previous) > threshold
+
+
+def regressions(
+    results: dict, baseline: dict, threshold=THRESHOLD, min_delta=MIN_DELTA
+):
+    return [
+        name
+        for name, elapsed in results.items()
+        if name in baseline
+        and is_regression(elapsed, baseline[name], threshold, min_delta)
+    ]
+
+
+def print_results(slow: list, results: dict, baseline: dict):
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'current':>11}  {'baseline':>11}  {'change':>8}")
+    for name, elapsed in results.items():
+        line = f"{name:<{width}}  {elapsed * 1000:8.3f} ms"
+        if name in baseline:
+            line += f"  {baseline[name] * 1000:8.3f} ms"
+            line += f"  {change(elapsed, baseline[name]):+7.1f}%"
+        if name in slow:
+            line += "  REGRESSION"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the project generator.",
+        epilog=(
+            "Timings only compare on the same machine, so no baseline is "
+            "committed. To check a change, benchmark both commits on the same "
+            "runner: check out the base commit and run 'python make/bench.py "
+            "--save --baseline /tmp/bench.json', then check out the change and "
+            "run 'python make/bench.py --baseline /tmp/bench.json'. The second "
+            "run fails on a regression. Without --baseline, results are only "
+            "printed."
+        ),
+    )
+    parser.add_argument("suites", nargs="*", metavar="SUITE", help=", ".join(SUITES))
+    parser.add_argument(
+        "--baseline", metavar="PATH", help="results recorded on this machine"
+    )
+    parser.add_argument(
+        "--threshold",
+        metavar="PERCENT",
+        type=float,
+        default=THRESHOLD,
+        help="flag benchmarks slower than the baseline by more than this much",
+    )
+    parser.add_argument(
+        "--min-delta",
+        metavar="MS",
+        type=float,
+        default=MIN_DELTA,
+        help="ignore slowdowns smaller than this many milliseconds",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the new baseline"
+    )
+    args = parser.parse_args(argv)
+    if args.save and not args.baseline:
+        parser.error("--save needs --baseline PATH")
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f"unknown suite {suite!r} (choose from {', '.join(SUITES)})")
+
+    benchmarks = {
+        "rewrite": bench_rewrite,
+        "settings": bench_settings,
+        "generate": bench_generate,
+    }
+    results = {}
+    for suite in args.suites or SUITES:
+        results.update(benchmarks[suite]())
+
+    if not args.baseline:
+        print_results([], results, {})
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not args.save and not baseline.keys() & results.keys():
+        print(f"No baseline for these benchmarks in {args.baseline}.", file=sys.stderr)
+        print("Run with --save to record one.", file=sys.stderr)
+        return 2
+    slow = regressions(results, baseline, args.threshold, args.min_delta)
+    print_results(slow, results, baseline)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        return 0
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import json
+
+import bench
+import pytest
+
+
+class TestRegressions:
+    def test_within_threshold(self):
+        assert bench.regressions({"a": 0.0110}, {"a": 0.0100}, threshold=20) == []
+
+    def test_above_threshold(self):
+        assert bench.regressions({"a": 0.0130}, {"a": 0.0100}, threshold=20) == ["a"]
+
+    def test_below_min_delta(self):
+        results = {"a": 0.00003}
+        baseline = {"a": 0.00001}
+        assert bench.regressions(results, baseline, threshold=20, min_delta=0.1) == []
+
+    def test_faster(self):
+        assert bench.regressions({"a": 0.001}, {"a": 0.010}, threshold=0) == []
+
+    def test_new_benchmark(self):
+        assert bench.regressions({"a": 1.0}, {}, threshold=0) == []
+
+
+class TestBaseline:
+    def test_missing(self, tmp_path):
+        assert bench.load_baseline(str(tmp_path / "bench.json")) == {}
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "bench.json")
+        bench.save_baseline(path, {"a": 1.0})
+        assert bench.load_baseline(path) == {"a": 1.0}
+
+    def test_merges(self, tmp_path):
+        path = str(tmp_path / "bench.json")
+        bench.save_baseline(path, {"a": 1.0, "b": 2.0})
+        bench.save_baseline(path, {"b": 3.0})
+        assert bench.load_baseline(path) == {"a": 1.0, "b": 3.0}
+
+
+class TestSettings:
+    def test_renders_template(self):
+        contents = bench.django_settings("myproject")
+        assert "{{" not in contents
+        assert "ROOT_URLCONF = 'myproject.urls'" in contents
+
+    @pytest.mark.parametrize("name", list(bench.settings_transforms()))
+    def test_transforms_realistic_settings(self, name):
+        contents = bench.django_settings()
+        func, *args = bench.settings_transforms()[name]
+        assert func(contents, *args) != contents
+
+    def test_bench_settings(self):
+        results = bench.bench_settings(number=1)
+        assert set(results) == {
+            f"settings/{name}" for name in bench.settings_transforms()
+        }
+
+
+class TestMain:
+    @pytest.fixture
+    def baseline(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bench, "bench_rewrite", lambda: {"rewrite/a": 0.002})
+        path = tmp_path / "bench.json"
+        path.write_text(json.dumps({"rewrite/a": 0.001}))
+        return path
+
+    def test_flags_regression(self, baseline):
+        assert bench.main(["rewrite", "--baseline", str(baseline)]) == 1
+
+    def test_threshold(self, baseline):
+        args = ["rewrite", "--baseline", str(baseline), "--threshold", "150"]
+        assert bench.main(args) == 0
+
+    def test_save(self, baseline):
+        assert bench.main(["rewrite", "--baseline", str(baseline), "--save"]) == 0
+        assert json.loads(baseline.read_text()) == {"rewrite/a": 0.002}
+
+    def test_missing_baseline(self, baseline, capsys):
+        baseline.unlink()
+        assert bench.main(["rewrite", "--baseline", str(baseline)]) == 2
+        assert "--save" in capsys.readouterr().err
+
+    def test_no_baseline(self, baseline):
+        assert bench.main(["rewrite"]) == 0
+
+    def test_save_needs_baseline(self, baseline):
+        with pytest.raises(SystemExit):
+            bench.main(["rewrite", "--save"])
+
+    def test_unknown_suite(self, baseline):
+        with pytest.raises(SystemExit):
+            bench.main(["nope", "--baseline", str(baseline)])
@@ -1,38 +1,115 @@
+import hashlib
 import os
 import re
+import shutil
+import threading
+from functools import lru_cache
 
-import black
 import settings
-from django.core.management.utils import get_random_secret_key
+import staging
+import tracing
 
+NUMBERED_BACKREFERENCE = re.compile(r"\\[1-9]")
+METACHARACTERS = set(".^$*+?{}[]\\|()")
 
-def replace_in_file(src: str, replacements, dest=None):
-    if dest is None:
-        dest = src
+formatted_sources = {}
+formatted_sources_lock = threading.Lock()
 
-    with open(src) as file:
-        contents = file.read()
 
-    for pattern, repl in replacements:
-        contents = re.sub(pattern, repl, contents)
+@lru_cache(maxsize=None)
+def compile_replacements(patterns: tuple):
+    compiled = tuple(re.compile(pattern) for pattern in patterns)
+    if len(patterns) < 2:
+        return compiled, None
+    if any(NUMBERED_BACKREFERENCE.search(pattern) for pattern in patterns):
+        return compiled, None
+    try:
+        combined = re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    except re.error:
+        combined = None
+    return compiled, combined
 
-    with open(dest, "w") as file:
-        file.write(contents)
 
+def is_literal(pattern: str):
+    return not METACHARACTERS.intersection(pattern)
+
+
+def rewrite(contents: str, replacements):
+    replacements = list(replacements)
+    if not replacements:
+        return contents
+
+    patterns = tuple(pattern for pattern, _ in replacements)
+    repls = [repl for _, repl in replacements]
+    compiled, combined = compile_replacements(patterns)
+
+    if combined is None:
+        for pattern, repl in zip(compiled, repls):
+            contents = pattern.sub(repl, contents)
+        return contents
+
+    literals = {}
+    if all(is_literal(pattern) for pattern in patterns):
+        for pattern, repl in zip(patterns, repls):
+            is_plain = isinstance(repl, str) and "\\" not in repl
+            literals.setdefault(pattern, repl if is_plain else None)
+
+    def substitute(match):
+        literal = literals.get(match.group())
+        if literal is not None:
+            return literal
+        start = match.start()
+        for pattern, repl in zip(compiled, repls):
+            inner = pattern.match(contents, start)
+            if inner is not None:
+                return repl(inner) if callable(repl) else inner.expand(repl)
+
+    return combined.sub(substitute, contents)
+
+
+def replace_in_file(src: str, replacements, dest=None):
+    if dest is None:
+        dest = src
+
+    contents = rewrite(staging.read(src), replacements)
+    staging.write(dest, contents)
 
-def exempt_long_lines(filename: str):
-    with open(filename) as file:
-        lines = file.readlines()
 
+def mark_long_lines(contents: str):
     modified_lines = [
         line.rstrip() + "  # noqa: E501\n"
         if len(line.rstrip()) > 88
         else line.rstrip() + "\n"
-        for line in lines
+        for line in contents.splitlines()
     ]
 
-    with open(filename, "w") as file:
-        file.writelines(modified_lines)
+    return "".join(modified_lines)
+
+
+def exempt_long_lines(filename: str):
+    staging.write(filename, mark_long_lines(staging.read(filename)))
+
+
+@tracing.traced("black", category="format")
+def format_source(contents: str):
+    key = hashlib.sha256(contents.encode()).hexdigest()
+    with formatted_sources_lock:
+        cached = formatted_sources.get(key)
+    if cached is not None:
+        return cached
+
+    import black
+
+    formatted = mark_long_lines(black.format_str(contents, mode=black.FileMode()))
+    formatted_key = hashlib.sha256(formatted.encode()).hexdigest()
+    with formatted_sources_lock:
+        formatted_sources[key] = formatted
+        formatted_sources[formatted_key] = formatted
+    return formatted
+
+
+def format_python(filename: str):
+    staging.write(filename, format_source(staging.read(filename)))
 
 
 def create_base_template(project: str):
@@ -70,6 +147,18 @@ def change_dockerfile(project: str):
     replace_in_file("docker/Dockerfile", replacements)
 
 
+def change_gunicorn_conf(project: str, asgi: bool = False):
+    replacements = [
+        ('"SITENAME", "django_starter"', f'"SITENAME", "{project}"'),
+    ]
+    if asgi:
+        replacements.append(
+            ('DEFAULT_WORKER_CLASS = "gthread"', 'DEFAULT_WORKER_CLASS = "uvicorn"')
+        )
+
+    replace_in_file("make/gunicorn.conf.py", replacements, dest="src/gunicorn.conf.py")
+
+
 def change_compose_prod(repo: str, deployer: str, env: str):
     replacements = [
         ("image: ghcr.io/REPO:main", f"image: ghcr.io/{repo}:main"),
@@ -79,6 +168,42 @@ def change_compose_prod(repo: str, deployer: str, env: str):
     replace_in_file(f"docker/docker-compose.{env}.yml", replacements)
 
 
+def add_pgbouncer(deployer: str, env: str = "prod"):
+    service = f"""  pgbouncer:
+    image: edoburu/pgbouncer:v1.23.1-p3
+    environment:
+      DB_HOST: db
+      DB_PORT: 5432
+      AUTH_TYPE: scram-sha-256
+      POOL_MODE: transaction
+      MAX_CLIENT_CONN: 500
+      DEFAULT_POOL_SIZE: 20
+    env_file:
+      - /home/{deployer}/.env.{env}
+    depends_on:
+      - db
+
+  {env}:
+"""
+    replacements = [
+        (f"  {env}:\n", service),
+        ("SQL_HOST: db\n", 'SQL_HOST: pgbouncer\n      SQL_PGBOUNCER: "1"\n'),
+        ("      - db\n\n", "      - pgbouncer\n\n"),
+    ]
+    replace_in_file(f"docker/docker-compose.{env}.yml", replacements)
+
+    filename = f"docker/.env.{env}"
+    contents = staging.read(filename)
+    values = dict(line.partition("=")[::2] for line in contents.splitlines())
+    credentials = [
+        f"DB_USER={values.get('SQL_USER', '')}",
+        f"DB_PASSWORD={values.get('SQL_PASSWORD', '')}",
+        f"DB_NAME={values.get('SQL_DATABASE', '')}",
+    ]
+    contents += os.linesep.join(credentials) + os.linesep
+    staging.write(filename, contents)
+
+
 def change_pytest_ini(project: str):
     replacements = [
         ("PROJECT", project),
@@ -87,7 +212,12 @@ def change_pytest_ini(project: str):
     replace_in_file("src/.pytest.ini", replacements, dest="src/pytest.ini")
 
 
-def make_env(env="prod", secret_key=get_random_secret_key(), debug=0):
+def make_env(env="prod", secret_key=None, debug=0):
+    if secret_key is None:
+        from django.core.management.utils import get_random_secret_key
+
+        secret_key = get_random_secret_key()
+
     replacements = [
         ("DEBUG=1", f"DEBUG={debug}"),
         ("SECRET_KEY=your_secret_key_here", f"SECRET_KEY={secret_key}"),
@@ -113,9 +243,7 @@ def change_readme(project: str):
     desc = ", ".join([f"[{text}]({url})" for text, url in descriptors])
     django = "[Django](https://www.djangoproject.com/)"
     content = f"# {project}\n\nThis is a {desc} {django} project."
-
-    with open("README.md", "w") as file:
-        file.write(content)
+    staging.write("README.md", content)
 
 
 def change_scripts(project: str):
@@ -129,9 +257,7 @@ def change_scripts(project: str):
 
 def change_urls(project: str, api_only: bool = False):
     filename = f"./src/{project}/urls.py"
-
-    with open(filename) as file:
-        contents = file.read()
+    contents = staging.read(filename)
 
     imports = []
     found_imports = re.findall(r"^from (.*?) import (.*?)$", contents, re.MULTILINE)
@@ -192,36 +318,68 @@ def change_urls(project: str, api_only: bool = False):
     var_section = os.linesep.join(variables)
     urlpatterns_section_inner = os.linesep.join(urlpatterns)
     urlpatterns_section = f"urlpatterns = [\n{urlpatterns_section_inner}\n]"
-    urlpatterns_section = black.format_str(urlpatterns_section, mode=black.FileMode())
     sections = [import_section, var_section, schema_view, urlpatterns_section]
-
-    with open(filename, "w") as file:
-        file.write(section_break.join(sections) + os.linesep)
-
-
-def change_settings(filename: str, users: str, providers: list, api_only: bool = False):
-    with open(filename) as file:
-        contents = file.read()
-
-    contents = settings.add_installed_apps(contents, users)
-    contents = settings.change_database_settings(contents)
-    contents = settings.set_project_template_dir(contents)
-    contents = settings.add_new_settings(contents, users, api_only=api_only)
-    contents = settings.add_import_os(contents)
-    contents = settings.set_secret_key(contents)
-    contents = settings.set_debug(contents)
-    contents = settings.set_allowed_hosts(contents)
-    contents = settings.add_prod_rest_framework_renderer(contents)
-    contents = settings.add_authentication_backends(contents)
-    contents = settings.remove_password_validators(contents)
-    contents = settings.add_social_auth_providers(contents, providers)
-
-    with open(filename, "w") as file:
-        file.write(contents)
+    staging.write(filename, section_break.join(sections) + os.linesep)
+
+
+def change_settings(
+    filename: str,
+    users: str,
+    providers: list,
+    api_only: bool = False,
+    fast_json: bool = True,
+    asgi: bool = False,
+):
+    contents = staging.read(filename)
+    contents = transform_settings(
+        contents, users, providers, api_only=api_only, fast_json=fast_json, asgi=asgi
+    )
+    staging.write(filename, contents)
+
+
+def transform_settings(
+    contents: str,
+    users: str,
+    providers: list,
+    api_only: bool = False,
+    fast_json: bool = True,
+    asgi: bool = False,
+):
+    tree = settings.SettingsTree(contents)
+
+    settings.add_installed_apps(tree, users)
+    settings.change_database_settings(tree, asgi=asgi)
+    settings.set_project_template_dir(tree)
+    settings.add_new_settings(tree, users, api_only=api_only, asgi=asgi)
+    settings.add_import_os(tree)
+    settings.set_secret_key(tree)
+    settings.set_debug(tree)
+    settings.set_allowed_hosts(tree)
+    settings.add_rest_framework(tree, users, fast_json=fast_json)
+    settings.add_authentication_backends(tree)
+    settings.add_password_hashers(tree, users)
+    settings.remove_password_validators(tree)
+    settings.add_social_auth_providers(tree, providers)
+    settings.add_test_settings(tree)
+    return tree.code
+
+
+def add_requirements(packages: list, filename: str = "./src/requirements.txt"):
+    contents = staging.read(filename)
+    lines = contents.splitlines()
+    names = {re.split(r"[=<>~\[]", line)[0].lower() for line in lines}
+    for package in packages:
+        if re.split(r"[=<>~\[]", package)[0].lower() not in names:
+            lines.append(package)
+    staging.write(filename, os.linesep.join(lines) + os.linesep)
 
 
 def copy_files(project: str, users: str, api_only: bool = False):
-    directories = [f"./src/{project}/templates", f"./src/{users}/templates"]
+    directories = [
+        f"./src/{project}/templates",
+        f"./src/{users}/templates",
+        f"./src/{users}/management/commands",
+    ]
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
 
@@ -233,8 +391,46 @@ def copy_files(project: str, users: str, api_only: bool = False):
         "make/templates/404.html": f"./src/{project}/templates/404.html",
         "make/templates/500.html": f"./src/{project}/templates/500.html",
         "make/users/admin.py": f"./src/{users}/admin.py",
+        "make/users/async_views.py": f"./src/{users}/async_views.py",
+        "make/users/async_views.test.py": f"./src/{users}/async_views_test.py",
+        "make/users/authentication.py": f"./src/{users}/authentication.py",
+        "make/users/authentication.test.py": (f"./src/{users}/authentication_test.py"),
+        "make/users/caching.py": f"./src/{users}/caching.py",
+        "make/users/connections.test.py": f"./src/{users}/connections_test.py",
         "make/users/forms.py": f"./src/{users}/forms.py",
+        "make/users/management/__init__.py": f"./src/{users}/management/__init__.py",
+        "make/users/management/commands/__init__.py": (
+            f"./src/{users}/management/commands/__init__.py"
+        ),
+        "make/users/management/commands/calibrate_hasher.py": (
+            f"./src/{users}/management/commands/calibrate_hasher.py"
+        ),
+        "make/users/management/commands/bench_json.py": (
+            f"./src/{users}/management/commands/bench_json.py"
+        ),
+        "make/users/management/commands/bench_serializers.py": (
+            f"./src/{users}/management/commands/bench_serializers.py"
+        ),
+        "make/users/management/commands/export_users.py": (
+            f"./src/{users}/management/commands/export_users.py"
+        ),
+        "make/users/management/commands/import_users.py": (
+            f"./src/{users}/management/commands/import_users.py"
+        ),
+        "make/users/management/commands/loadtest.py": (
+            f"./src/{users}/management/commands/loadtest.py"
+        ),
+        "make/users/management/commands/send_queued_mail.py": (
+            f"./src/{users}/management/commands/send_queued_mail.py"
+        ),
+        "make/users/mail.py": f"./src/{users}/mail.py",
+        "make/users/mail.test.py": f"./src/{users}/mail_test.py",
+        "make/users/hashing.py": f"./src/{users}/hashing.py",
+        "make/users/hashing.test.py": f"./src/{users}/hashing_test.py",
+        "make/users/import_export.test.py": f"./src/{users}/import_export_test.py",
         "make/users/models.py": f"./src/{users}/models.py",
+        "make/users/renderers.py": f"./src/{users}/renderers.py",
+        "make/users/renderers.test.py": f"./src/{users}/renderers_test.py",
         "make/users/models.test.py": f"./src/{users}/models_test.py",
         "make/users/serializers.py": f"./src/{users}/serializers.py",
         "make/users/serializers.test.py": f"./src/{users}/serializers_test.py",
@@ -253,9 +449,7 @@ def copy_files(project: str, users: str, api_only: bool = False):
 
 def add_provider_env(providers, env="prod"):
     filename = f"docker/.env.{env}"
-
-    with open(filename) as file:
-        contents = file.read()
+    contents = staging.read(filename)
 
     for provider in providers:
         prefix = "SNAPCHAT" if provider == "snap" else provider.upper()
@@ -272,22 +466,46 @@ def add_provider_env(providers, env="prod"):
         if provider == "reddit":
             contents += "REDDIT_USERNAME=your_reddit_username_here" + os.linesep
 
-    with open(filename, "w") as file:
-        file.write(contents)
-
-
-def make_next(providers: list):
-    fragments = []
-
-    with open("./next/1.md") as file:
-        fragments.append(file.read())
-
-    for provider in providers:
-        with open(f"./next/{provider}.md") as file:
-            fragments.append(file.read())
-
-    with open("./next/2.md") as file:
-        fragments.append(file.read())
-
-    with open("./NEXT.md", "w") as file:
-        file.write(os.linesep.join(fragments))
+    staging.write(filename, contents)
+
+
+def make_next(providers: list, pgbouncer: bool = False):
+    fragments = [staging.read("./next/1.md")]
+    fragments += [staging.read(f"./next/{provider}.md") for provider in providers]
+    if pgbouncer:
+        fragments.append(staging.read("./next/pgbouncer.md"))
+    fragments.append(staging.read("./next/2.md"))
+    staging.write("./NEXT.md", os.linesep.join(fragments))
+
+
+STARTER_FILES = [
+    ".gitignore",
+    ".isort.cfg",
+    ".pre-commit-config.yaml",
+    "LICENSE",
+    "README.md",
+    "docker",
+    "down.sh",
+    "src",
+    "up.sh",
+]
+
+
+def copy_starter(root: str, dest: str):
+    root = os.path.abspath(root)
+    dest = os.path.abspath(dest)
+    skipped = {"__pycache__", ".pytest_cache", "env"}
+
+    def ignore(directory, names):
+        ignored = [name for name in names if name in skipped]
+        ignored += [name for name in names if os.path.join(directory, name) == dest]
+        return ignored
+
+    os.makedirs(dest, exist_ok=True)
+    for name in STARTER_FILES:
+        source = os.path.join(root, name)
+        if os.path.isdir(source):
+            target = os.path.join(dest, name)
+            shutil.copytree(source, target, ignore=ignore, dirs_exist_ok=True)
+        elif os.path.exists(source):
+            shutil.copy2(source, dest)
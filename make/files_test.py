@@ -1,4 +1,5 @@
 import os
+import shutil
 from unittest.mock import MagicMock, mock_open
 
 import files
@@ -13,6 +14,14 @@ urlpatterns = [
 """
 
 
+@pytest.fixture
+def formatter():
+    import black
+
+    black.format_str("", mode=black.FileMode())
+    return black
+
+
 @pytest.fixture
 def mock_file(monkeypatch):
     mock = mock_open()
@@ -54,27 +63,99 @@ class TestReplaceInFile:
         assert len(args) == 2
 
 
+class TestRewrite:
+    def test_no_replacements(self):
+        assert files.rewrite("in", []) == "in"
+
+    def test_multiple_patterns(self):
+        replacements = [("PROJECT", "myproject"), ("DEPLOYER", "user")]
+        actual = files.rewrite("PROJECT DEPLOYER PROJECT", replacements)
+        assert actual == "myproject user myproject"
+
+    def test_group_reference(self):
+        replacements = [(r"a(\d)", r"b\1"), (r"c(?P<n>\d)", r"d\g<n>")]
+        assert files.rewrite("a1 c2", replacements) == "b1 d2"
+
+    def test_escapes_in_repl(self):
+        assert files.rewrite("a b", [(" ", r"\n")]) == "a\nb"
+
+    def test_callable_repl(self):
+        assert files.rewrite("abc", [("b", lambda m: m.group().upper())]) == "aBc"
+
+    def test_single_pass(self):
+        replacements = [("A", "B"), ("B", "C")]
+        assert files.rewrite("AB", replacements) == "BC"
+
+    def test_first_pattern_wins(self):
+        replacements = [("ab", "1"), ("abc", "2")]
+        assert files.rewrite("abc", replacements) == "1c"
+
+    def test_first_literal_wins(self):
+        replacements = [("a", lambda m: "1"), ("a", "2"), ("b", "3")]
+        assert files.rewrite("ab", replacements) == "13"
+
+    def test_numbered_backreference_in_pattern(self):
+        replacements = [(r"(x)\1", "y"), ("z", "w")]
+        assert files.rewrite("xxz", replacements) == "yw"
+
+    def test_compiled_once(self):
+        files.compile_replacements.cache_clear()
+        files.rewrite("in", [("in", "out")])
+        files.rewrite("in", [("in", "other")])
+        assert files.compile_replacements.cache_info().hits == 1
+
+
 class TestExemptLongLines:
     def test_less_than(self, mock_file):
         content = "A" * 87 + "\n"
-        mock_file().readlines.return_value = [content]
+        mock_file().read.return_value = content
         files.exempt_long_lines("test.txt")
-        actual = mock_file().writelines.call_args[0][0]
-        assert actual == [content]
+        actual = mock_file().write.call_args[0][0]
+        assert actual == content
 
     def test_equal_to(self, mock_file):
         content = "A" * 88 + "\n"
-        mock_file().readlines.return_value = [content]
+        mock_file().read.return_value = content
         files.exempt_long_lines("test.txt")
-        actual = mock_file().writelines.call_args[0][0]
-        assert actual == [content]
+        actual = mock_file().write.call_args[0][0]
+        assert actual == content
 
     def test_greater_than(self, mock_file):
         content = "A" * 89 + "\n"
-        mock_file().readlines.return_value = [content]
+        mock_file().read.return_value = content
         files.exempt_long_lines("test.txt")
-        actual = mock_file().writelines.call_args[0][0]
-        assert actual == ["A" * 89 + "  # noqa: E501\n"]
+        actual = mock_file().write.call_args[0][0]
+        assert actual == "A" * 89 + "  # noqa: E501\n"
+
+
+class TestFormatSource:
+    def test_formats(self):
+        assert files.format_source("x = {'a':1}") == 'x = {"a": 1}\n'
+
+    def test_exempts_long_lines(self):
+        source = f'x = "{"A" * 90}"\n'
+        assert files.format_source(source) == source.rstrip() + "  # noqa: E501\n"
+
+    def test_formats_once(self, formatter, monkeypatch):
+        calls = []
+        format_str = formatter.format_str
+
+        def counting_format_str(*args, **kwargs):
+            calls.append(args)
+            return format_str(*args, **kwargs)
+
+        monkeypatch.setattr(formatter, "format_str", counting_format_str)
+        source = "y = [1,2]\n"
+        formatted = files.format_source(source)
+        files.format_source(source)
+        files.format_source(formatted)
+        assert len(calls) == 1
+
+
+def test_format_python(formatter, mock_file):
+    mock_file().read.return_value = "z = ( 1 )"
+    files.format_python("settings.py")
+    assert mock_file().write.call_args[0][0] == "z = 1\n"
 
 
 class TestCreateBaseTemplate:
@@ -163,6 +244,28 @@ def test_change_compose_prod_args(monkeypatch):
     )
 
 
+def test_change_gunicorn_conf_args(monkeypatch):
+    replace_in_file_mock = MagicMock()
+    monkeypatch.setattr(files, "replace_in_file", replace_in_file_mock)
+    files.change_gunicorn_conf("myproject")
+    replace_in_file_mock.assert_called_once_with(
+        "make/gunicorn.conf.py",
+        [('"SITENAME", "django_starter"', '"SITENAME", "myproject"')],
+        dest="src/gunicorn.conf.py",
+    )
+
+
+def test_change_gunicorn_conf_asgi(monkeypatch):
+    replace_in_file_mock = MagicMock()
+    monkeypatch.setattr(files, "replace_in_file", replace_in_file_mock)
+    files.change_gunicorn_conf("myproject", asgi=True)
+    replacement = (
+        'DEFAULT_WORKER_CLASS = "gthread"',
+        'DEFAULT_WORKER_CLASS = "uvicorn"',
+    )
+    assert replacement in replace_in_file_mock.call_args[0][1]
+
+
 def test_change_pytest_ini_args(monkeypatch):
     replace_in_file_mock = MagicMock()
     monkeypatch.setattr(files, "replace_in_file", replace_in_file_mock)
@@ -187,6 +290,57 @@ def test_make_env_args(monkeypatch):
     )
 
 
+class TestAddPgbouncer:
+    @pytest.fixture
+    def generated(self, tmp_path, monkeypatch):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        os.makedirs(tmp_path / "docker")
+        shutil.copy(
+            os.path.join(root, "docker", "docker-compose.prod.yml"),
+            tmp_path / "docker" / "docker-compose.prod.yml",
+        )
+        shutil.copy(
+            os.path.join(root, "docker", ".env.example"),
+            tmp_path / "docker" / ".env.prod",
+        )
+        monkeypatch.chdir(tmp_path)
+        files.add_pgbouncer("deployer")
+        compose = (tmp_path / "docker" / "docker-compose.prod.yml").read_text()
+        env = (tmp_path / "docker" / ".env.prod").read_text()
+        return compose, env
+
+    def test_services(self, generated):
+        yaml = pytest.importorskip("yaml")
+        services = yaml.safe_load(generated[0])["services"]
+        assert services["pgbouncer"]["image"] == "edoburu/pgbouncer:v1.23.1-p3"
+        assert services["pgbouncer"]["environment"]["POOL_MODE"] == "transaction"
+        assert services["pgbouncer"]["depends_on"] == ["db"]
+        assert services["pgbouncer"]["env_file"] == ["/home/deployer/.env.prod"]
+        assert services["prod"]["environment"]["SQL_HOST"] == "pgbouncer"
+        assert services["prod"]["environment"]["SQL_PGBOUNCER"] == "1"
+        assert services["prod"]["depends_on"] == ["pgbouncer"]
+        assert services["mail"]["environment"]["SQL_HOST"] == "pgbouncer"
+        assert services["mail"]["depends_on"] == ["pgbouncer"]
+
+    def test_credentials(self, generated):
+        _, env = generated
+        assert "DB_USER=django_db_user\n" in env
+        assert "DB_PASSWORD=password\n" in env
+        assert "DB_NAME=myproject_db\n" in env
+        assert env.count("=password\n") == 3
+
+    def test_credentials_follow_sql_settings(self, tmp_path, monkeypatch):
+        os.makedirs(tmp_path / "docker")
+        (tmp_path / "docker" / "docker-compose.prod.yml").write_text("")
+        (tmp_path / "docker" / ".env.prod").write_text(
+            "SQL_DATABASE=app\nSQL_USER=owner\nSQL_PASSWORD=a=b\n"
+        )
+        monkeypatch.chdir(tmp_path)
+        files.add_pgbouncer("deployer")
+        env = (tmp_path / "docker" / ".env.prod").read_text()
+        assert env.endswith("DB_USER=owner\nDB_PASSWORD=a=b\nDB_NAME=app\n")
+
+
 class TestChangeReadme:
     @pytest.fixture
     def change_readme_content(self, mock_file):
@@ -250,16 +404,16 @@ class TestChangeScripts:
 
 class TestChangeURLs:
     @pytest.fixture
-    def contents(self, mock_file):
+    def contents(self, formatter, mock_file):
         mock_file().read.return_value = urls_py_content
         files.change_urls("myproject")
-        return mock_file().write.call_args[0][0]
+        return files.format_source(mock_file().write.call_args[0][0])
 
     @pytest.fixture
-    def contents_api_only(self, mock_file):
+    def contents_api_only(self, formatter, mock_file):
         mock_file().read.return_value = urls_py_content
         files.change_urls("myproject", api_only=True)
-        return mock_file().write.call_args[0][0]
+        return files.format_source(mock_file().write.call_args[0][0])
 
     def test_preserve_imports(self, contents):
         assert "from django.contrib import admin" in contents
@@ -423,12 +577,124 @@ class TestCopyFiles:
     def test_write_users_admin(self, calls):
         assert "('./src/usersapp/admin.py', 'w')" in calls
 
+    def test_read_users_async_views(self, calls):
+        assert "('make/users/async_views.py',)" in calls
+
+    def test_write_users_async_views(self, calls):
+        assert "('./src/usersapp/async_views.py', 'w')" in calls
+
+    def test_read_users_async_views_test(self, calls):
+        assert "('make/users/async_views.test.py',)" in calls
+
+    def test_write_users_async_views_test(self, calls):
+        assert "('./src/usersapp/async_views_test.py', 'w')" in calls
+
+    def test_read_users_authentication(self, calls):
+        assert "('make/users/authentication.py',)" in calls
+
+    def test_write_users_authentication(self, calls):
+        assert "('./src/usersapp/authentication.py', 'w')" in calls
+
+    def test_read_users_authentication_test(self, calls):
+        assert "('make/users/authentication.test.py',)" in calls
+
+    def test_write_users_authentication_test(self, calls):
+        assert "('./src/usersapp/authentication_test.py', 'w')" in calls
+
+    def test_read_users_caching(self, calls):
+        assert "('make/users/caching.py',)" in calls
+
+    def test_write_users_caching(self, calls):
+        assert "('./src/usersapp/caching.py', 'w')" in calls
+
+    def test_read_users_connections_test(self, calls):
+        assert "('make/users/connections.test.py',)" in calls
+
+    def test_write_users_connections_test(self, calls):
+        assert "('./src/usersapp/connections_test.py', 'w')" in calls
+
     def test_read_users_forms(self, calls):
         assert "('make/users/forms.py',)" in calls
 
     def test_write_users_forms(self, calls):
         assert "('./src/usersapp/forms.py', 'w')" in calls
 
+    def test_read_users_management_command(self, calls):
+        path = "make/users/management/commands/bench_serializers.py"
+        assert f"('{path}',)" in calls
+
+    def test_write_users_management_command(self, calls):
+        path = "./src/usersapp/management/commands/bench_serializers.py"
+        assert f"('{path}', 'w')" in calls
+
+    def test_read_users_hashing(self, calls):
+        assert "('make/users/hashing.py',)" in calls
+
+    def test_write_users_hashing(self, calls):
+        assert "('./src/usersapp/hashing.py', 'w')" in calls
+
+    def test_read_users_hashing_test(self, calls):
+        assert "('make/users/hashing.test.py',)" in calls
+
+    def test_write_users_hashing_test(self, calls):
+        assert "('./src/usersapp/hashing_test.py', 'w')" in calls
+
+    def test_read_users_calibrate_hasher(self, calls):
+        path = "make/users/management/commands/calibrate_hasher.py"
+        assert f"('{path}',)" in calls
+
+    def test_write_users_calibrate_hasher(self, calls):
+        path = "./src/usersapp/management/commands/calibrate_hasher.py"
+        assert f"('{path}', 'w')" in calls
+
+    @pytest.mark.parametrize("command", ["export_users", "import_users"])
+    def test_read_users_import_export_commands(self, calls, command):
+        path = f"make/users/management/commands/{command}.py"
+        assert f"('{path}',)" in calls
+
+    @pytest.mark.parametrize("command", ["export_users", "import_users"])
+    def test_write_users_import_export_commands(self, calls, command):
+        path = f"./src/usersapp/management/commands/{command}.py"
+        assert f"('{path}', 'w')" in calls
+
+    def test_read_users_import_export_test(self, calls):
+        assert "('make/users/import_export.test.py',)" in calls
+
+    def test_write_users_import_export_test(self, calls):
+        assert "('./src/usersapp/import_export_test.py', 'w')" in calls
+
+    def test_read_users_mail_worker(self, calls):
+        path = "make/users/management/commands/send_queued_mail.py"
+        assert f"('{path}',)" in calls
+
+    def test_write_users_mail_worker(self, calls):
+        path = "./src/usersapp/management/commands/send_queued_mail.py"
+        assert f"('{path}', 'w')" in calls
+
+    def test_read_users_mail(self, calls):
+        assert "('make/users/mail.py',)" in calls
+
+    def test_write_users_mail(self, calls):
+        assert "('./src/usersapp/mail.py', 'w')" in calls
+
+    def test_read_users_mail_test(self, calls):
+        assert "('make/users/mail.test.py',)" in calls
+
+    def test_write_users_mail_test(self, calls):
+        assert "('./src/usersapp/mail_test.py', 'w')" in calls
+
+    def test_read_users_renderers(self, calls):
+        assert "('make/users/renderers.py',)" in calls
+
+    def test_write_users_renderers(self, calls):
+        assert "('./src/usersapp/renderers.py', 'w')" in calls
+
+    def test_read_users_renderers_test(self, calls):
+        assert "('make/users/renderers.test.py',)" in calls
+
+    def test_write_users_renderers_test(self, calls):
+        assert "('./src/usersapp/renderers_test.py', 'w')" in calls
+
     def test_read_users_models(self, calls):
         assert "('make/users/models.py',)" in calls
 
@@ -574,6 +840,25 @@ def test_add_provider_env(mock_file):
     assert "TWITCH_KEY=" in actual
 
 
+class TestAddRequirements:
+    @pytest.fixture
+    def requirements(self, tmp_path):
+        path = tmp_path / "requirements.txt"
+        path.write_text("Django==4.2.5\ndjangorestframework==3.14.0\n")
+        return path
+
+    def test_adds_package(self, requirements):
+        files.add_requirements(["orjson==3.9.7"], str(requirements))
+        assert requirements.read_text().splitlines()[-1] == "orjson==3.9.7"
+
+    def test_skips_existing(self, requirements):
+        files.add_requirements(["django>=4"], str(requirements))
+        assert requirements.read_text().splitlines() == [
+            "Django==4.2.5",
+            "djangorestframework==3.14.0",
+        ]
+
+
 class TestMakeNext:
     @pytest.fixture
     def mock(self, mock_file):
@@ -594,6 +879,11 @@ class TestMakeNext:
         assert args[0] == ("./NEXT.md", "w")
         assert "Two" in text
 
+    def test_read_pgbouncer(self, mock):
+        files.make_next([], pgbouncer=True)
+        args = mock.call_args_list[2]
+        assert args[0] == ("./next/pgbouncer.md",)
+
     def test_read_1(self, mock):
         files.make_next([])
         args = mock.call_args_list[1]
@@ -701,3 +991,41 @@ class TestMakeNext:
         text = mock().write.call_args[0][0]
         assert args[0] == ("./NEXT.md", "w")
         assert "Two" in text
+
+
+class TestCopyStarter:
+    @pytest.fixture
+    def starter(self, tmp_path):
+        root = tmp_path / "starter"
+        paths = ["README.md", "make.sh", "cd.yml", "make/run.py", "docker/x"]
+        paths += ["requests.jsonl", ".pytest_cache/x", "src/env/x", "src/.flake8"]
+        for path in paths:
+            (root / path).parent.mkdir(parents=True, exist_ok=True)
+            (root / path).write_text(path)
+        return root
+
+    def test_copies_starter(self, starter, tmp_path):
+        files.copy_starter(str(starter), str(tmp_path / "out"))
+        assert (tmp_path / "out" / "README.md").read_text() == "README.md"
+        assert (tmp_path / "out" / "docker" / "x").read_text() == "docker/x"
+
+    def test_skips_generator(self, starter, tmp_path):
+        files.copy_starter(str(starter), str(tmp_path / "out"))
+        assert not (tmp_path / "out" / "make").exists()
+        assert not (tmp_path / "out" / "make.sh").exists()
+        assert not (tmp_path / "out" / "cd.yml").exists()
+
+    def test_copies_only_starter_files(self, starter, tmp_path):
+        files.copy_starter(str(starter), str(tmp_path / "out"))
+        assert (tmp_path / "out" / "src" / ".flake8").exists()
+        assert not (tmp_path / "out" / "src" / "env").exists()
+        assert not (tmp_path / "out" / "requests.jsonl").exists()
+        assert not (tmp_path / "out" / ".pytest_cache").exists()
+
+    def test_starter_files_tracked(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        assert all(os.path.exists(os.path.join(root, f)) for f in files.STARTER_FILES)
+
+    def test_skips_output_inside_starter(self, starter):
+        files.copy_starter(str(starter), str(starter / "out"))
+        assert not (starter / "out" / "out").exists()
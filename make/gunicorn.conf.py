@@ -0,0 +1,88 @@
+import math
+import os
+
+DEFAULT_WORKER_CLASS = "gthread"
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+
+def env_int(name: str, default: int):
+    value = os.environ.get(name, "")
+    return int(value) if value.strip() else default
+
+
+def env_bool(name: str, default: bool):
+    value = os.environ.get(name, "")
+    if not value.strip():
+        return default
+    return value.strip().lower() in ["1", "true", "yes", "on"]
+
+
+def cgroup_cpus(path: str = "/sys/fs/cgroup/cpu.max"):
+    try:
+        with open(path) as file:
+            quota, period = file.read().split()
+    except (OSError, ValueError):
+        return None
+
+    if quota == "max":
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def available_cpus():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpus()
+    return cpus if limit is None else min(cpus, limit)
+
+
+def default_workers(kind: str, cpus: int):
+    if kind == "sync":
+        return 2 * cpus + 1
+    elif kind == "gthread":
+        return cpus + 1
+    return cpus
+
+
+kind = os.environ.get("GUNICORN_WORKER_CLASS", "").strip().lower()
+kind = kind or DEFAULT_WORKER_CLASS
+if kind not in WORKER_CLASSES:
+    choices = ", ".join(WORKER_CLASSES)
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of: {choices}")
+
+sitename = os.environ.get("SITENAME", "django_starter")
+interface = "asgi" if kind == "uvicorn" else "wsgi"
+wsgi_app = f"{sitename}.{interface}:application"
+
+bind = f"0.0.0.0:{env_int('PORT', 8000)}"
+worker_class = WORKER_CLASSES[kind]
+workers = env_int("GUNICORN_WORKERS", default_workers(kind, available_cpus()))
+threads = env_int("GUNICORN_THREADS", 4 if kind == "gthread" else 1)
+
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+preload_app = env_bool("GUNICORN_PRELOAD", True)
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()
@@ -0,0 +1,93 @@
+import os
+import runpy
+
+import pytest
+
+CONF = os.path.join(os.path.dirname(__file__), "gunicorn.conf.py")
+
+
+@pytest.fixture
+def load(monkeypatch):
+    for name in list(os.environ):
+        if name.startswith("GUNICORN_"):
+            monkeypatch.delenv(name)
+    monkeypatch.delenv("SITENAME", raising=False)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda _: {0, 1, 2, 3})
+
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(CONF)
+
+    return load
+
+
+def test_defaults_to_gthread(load):
+    conf = load()
+    assert conf["worker_class"] == "gthread"
+    assert conf["wsgi_app"] == "django_starter.wsgi:application"
+    assert conf["threads"] == 4
+    assert conf["preload_app"] is True
+
+
+def test_empty_worker_class_uses_default(load):
+    assert load(GUNICORN_WORKER_CLASS="")["worker_class"] == "gthread"
+
+
+def test_workers_from_cpus(load):
+    conf = load()
+    limit = conf["cgroup_cpus"]()
+    cpus = 4 if limit is None else min(4, limit)
+    assert conf["workers"] == cpus + 1
+
+
+@pytest.mark.parametrize("kind,workers", [("sync", 9), ("gthread", 5), ("uvicorn", 4)])
+def test_default_workers(load, kind, workers):
+    assert load()["default_workers"](kind, 4) == workers
+
+
+def test_uvicorn_serves_asgi(load):
+    conf = load(GUNICORN_WORKER_CLASS="uvicorn", SITENAME="myproject")
+    assert conf["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert conf["wsgi_app"] == "myproject.asgi:application"
+    assert conf["threads"] == 1
+
+
+def test_env_overrides(load):
+    conf = load(
+        GUNICORN_WORKERS="3",
+        GUNICORN_THREADS="8",
+        GUNICORN_MAX_REQUESTS="500",
+        GUNICORN_PRELOAD="0",
+    )
+    assert conf["workers"] == 3
+    assert conf["threads"] == 8
+    assert conf["max_requests"] == 500
+    assert conf["max_requests_jitter"] == 50
+    assert conf["preload_app"] is False
+
+
+def test_empty_values_use_defaults(load):
+    conf = load(GUNICORN_THREADS="", GUNICORN_MAX_REQUESTS="")
+    assert conf["threads"] == 4
+    assert conf["max_requests"] == 1000
+
+
+def test_rejects_unknown_worker_class(load):
+    with pytest.raises(ValueError, match="GUNICORN_WORKER_CLASS"):
+        load(GUNICORN_WORKER_CLASS="eventlet")
+
+
+class TestCgroupCpus:
+    def test_quota(self, load, tmp_path):
+        path = tmp_path / "cpu.max"
+        path.write_text("150000 100000\n")
+        assert load()["cgroup_cpus"](str(path)) == 2
+
+    def test_unlimited(self, load, tmp_path):
+        path = tmp_path / "cpu.max"
+        path.write_text("max 100000\n")
+        assert load()["cgroup_cpus"](str(path)) is None
+
+    def test_missing(self, load, tmp_path):
+        assert load()["cgroup_cpus"](str(tmp_path / "cpu.max")) is None
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+MAKE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_MS = os.environ.get("IMPORT_BUDGET_MS")
+DEFERRED = ["black", "django", "git", "inquirer"]
+
+
+def import_times(module: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=MAKE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope="module")
+def times():
+    return import_times("run")
+
+
+@pytest.mark.skipif(not BUDGET_MS, reason="set IMPORT_BUDGET_MS to check")
+def test_cold_start_budget(times):
+    assert times["run"] / 1000 < float(BUDGET_MS)
+
+
+@pytest.mark.parametrize("module", DEFERRED)
+def test_defers_heavy_import(times, module):
+    assert module not in times
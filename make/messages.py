@@ -16,3 +16,11 @@ def print_intro():
       you’re looking for, well, let’s get started!"""
     print_bold(title)
     print(cleandoc(intro))
+
+
+def print_timings(tasks: list, elapsed: float):
+    print_bold("Generation timings")
+    width = max([len(task.name) for task in tasks] + [len("total")])
+    for task in sorted(tasks, key=lambda task: task.elapsed or 0, reverse=True):
+        print(f"  {task.name:<{width}}  {(task.elapsed or 0) * 1000:8.1f} ms")
+    print(f"  {'total':<{width}}  {elapsed * 1000:8.1f} ms")
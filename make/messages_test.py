@@ -1,4 +1,6 @@
 import messages
+import pytest
+import tasks
 
 
 def test_print_bold(capsys):
@@ -20,3 +22,26 @@ class TestPrintIntro:
         captured = capsys.readouterr()
         expected = "This script will help you get set up"
         assert expected in captured.out
+
+
+class TestPrintTimings:
+    @pytest.fixture
+    def output(self, capsys):
+        fast = tasks.Task("fast", lambda: None)
+        fast.elapsed = 0.001
+        slow = tasks.Task("slow", lambda: None)
+        slow.elapsed = 0.25
+        messages.print_timings([fast, slow], 0.3)
+        return capsys.readouterr().out
+
+    def test_title(self, output):
+        assert "\033[1mGeneration timings\033[0m\n" in output
+
+    def test_slowest_first(self, output):
+        assert output.index("slow") < output.index("fast")
+
+    def test_task_time(self, output):
+        assert "slow      250.0 ms" in output
+
+    def test_total(self, output):
+        assert "total     300.0 ms" in output
@@ -1,13 +1,66 @@
+import os
 import subprocess
+import sys
+from functools import lru_cache
+from importlib import import_module
+from importlib.machinery import PathFinder
 
+import tracing
 
+MAKE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ScaffoldNameMixin:
+    def validate_name(self, name, name_or_dir="name"):
+        from django.core.management import CommandError
+
+        if name is None:
+            raise CommandError(
+                f"you must provide {self.a_or_an} {self.app_or_project} name"
+            )
+        if not name.isidentifier():
+            raise CommandError(
+                f"'{name}' is not a valid {self.app_or_project} {name_or_dir}. Please "
+                "make sure the name is a valid identifier."
+            )
+        if is_importable(name):
+            raise CommandError(
+                f"'{name}' conflicts with the name of an existing Python module and "
+                f"cannot be used as {self.a_or_an} {self.app_or_project} "
+                f"{name_or_dir}. Please try another {name_or_dir}."
+            )
+
+
+@lru_cache(maxsize=None)
+def scaffold_command(name: str):
+    command = import_module(f"django.core.management.commands.{name}").Command
+    return type(f"Scaffold{command.__name__}", (ScaffoldNameMixin, command), {})
+
+
+def is_importable(name: str):
+    paths = [path for path in sys.path if os.path.abspath(path) != MAKE_DIR]
+    builtin = name in sys.builtin_module_names
+    return builtin or PathFinder.find_spec(name, paths) is not None
+
+
+def scaffold(command: str, *args):
+    from django.core.management import call_command
+
+    call_command(scaffold_command(command)(), *args)
+
+
+@tracing.traced()
 def create_django_project(project: str):
-    subprocess.run(["django-admin", "startproject", project, "."], cwd="src")
+    scaffold("startproject", project, "src")
 
 
+@tracing.traced()
 def create_users_app(users: str):
-    subprocess.run(["python", "manage.py", "startapp", users], cwd="src")
+    directory = os.path.join("src", users)
+    os.makedirs(directory, exist_ok=True)
+    scaffold("startapp", users, directory)
 
 
+@tracing.traced()
 def create_templates_dir(project: str):
     subprocess.run(["mkdir", "-p", f"{project}/templates/registration"], cwd="src")
@@ -1,58 +1,74 @@
+import os
 import subprocess
 
 import processes
 import pytest
+from django.core.management import CommandError
 
 
 class TestCreateDjangoProject:
     @pytest.fixture
     def setup(self, monkeypatch):
-        run_args = None
-
-        def mock_run(*args, **kwargs):
-            nonlocal run_args
-            run_args = (args, kwargs)
+        calls = []
+        monkeypatch.setattr(processes, "scaffold", lambda *args: calls.append(args))
+        processes.create_django_project("myproject")
+        return calls
 
-        monkeypatch.setattr(subprocess, "run", mock_run)
-        test_project_name = "myproject"
-        processes.create_django_project(test_project_name)
-        return run_args, test_project_name
-
-    def test_command(self, setup):
-        run_args, test_project_name = setup
-        assert run_args[0][0] == [
-            "django-admin",
-            "startproject",
-            test_project_name,
-            ".",
-        ]
-
-    def test_cwd(self, setup):
-        run_args, _ = setup
-        assert run_args[1]["cwd"] == "src"
+    def test_args(self, setup):
+        assert setup == [("startproject", "myproject", "src")]
 
 
 class TestCreateUsersApp:
     @pytest.fixture
-    def setup(self, monkeypatch):
-        run_args = None
-
-        def mock_run(*args, **kwargs):
-            nonlocal run_args
-            run_args = (args, kwargs)
-
-        monkeypatch.setattr(subprocess, "run", mock_run)
-        test_app_name = "users"
-        processes.create_users_app(test_app_name)
-        return run_args, test_app_name
-
-    def test_command(self, setup):
-        run_args, test_app_name = setup
-        assert run_args[0][0] == ["python", "manage.py", "startapp", test_app_name]
-
-    def test_cwd(self, setup):
-        run_args, _ = setup
-        assert run_args[1]["cwd"] == "src"
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        calls = []
+        monkeypatch.setattr(processes, "scaffold", lambda *args: calls.append(args))
+        processes.create_users_app("users")
+        return calls, tmp_path
+
+    def test_args(self, setup):
+        calls, _ = setup
+        assert calls == [("startapp", "users", os.path.join("src", "users"))]
+
+    def test_makes_directory(self, setup):
+        _, tmp_path = setup
+        assert (tmp_path / "src" / "users").is_dir()
+
+
+class TestScaffold:
+    def test_calls_command(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "django.core.management.call_command", lambda *args: calls.append(args)
+        )
+        processes.scaffold("startproject", "myproject", "src")
+        command, *args = calls[0]
+        assert isinstance(command, processes.ScaffoldNameMixin)
+        assert args == ["myproject", "src"]
+
+    @pytest.mark.parametrize("name", ["startproject", "startapp"])
+    def test_command(self, name):
+        command = processes.scaffold_command(name)
+        assert command.__module__ == "processes"
+        assert command.mro()[2].__module__ == f"django.core.management.commands.{name}"
+
+
+class TestValidateName:
+    def test_ignores_generator_modules(self):
+        assert not processes.is_importable("files")
+
+    @pytest.mark.parametrize(
+        "command, name",
+        [
+            ("startproject", "django"),
+            ("startapp", "sys"),
+            ("startproject", "my-project"),
+        ],
+    )
+    def test_rejects(self, command, name):
+        with pytest.raises(CommandError):
+            processes.scaffold(command, name, "src")
 
 
 class TestCreateTemplatesDir:
@@ -1,7 +1,22 @@
 from getpass import getpass
 from inspect import cleandoc
 
-import inquirer
+PROVIDERS = {
+    "Apple": "apple",
+    "Auth0": "auth0",
+    "Digital Ocean": "digitalocean",
+    "Discord": "discord",
+    "Facebook": "facebook",
+    "GitHub": "github",
+    "Google": "google",
+    "Instagram": "instagram",
+    "LinkedIn": "linkedin",
+    "Patreon": "patreon",
+    "Reddit": "reddit",
+    "Slack": "slack",
+    "Snapchat": "snap",
+    "Twitch": "twitch",
+}
 
 
 def prompt(msg: str, prompt_text: str, required: bool = False, options: dict = None):
@@ -25,16 +40,18 @@ def prompt_password(msg: str, prompt_text: str):
 def get_project(default_value: str):
     msg = "What would you like to call your project?"
     prompt_text = f"Project name ({default_value}): "
-    valid = False
-    while not valid:
+    while True:
         input_value = prompt(msg, prompt_text) or default_value
-        all_lower = input_value == input_value.lower()
-        no_dashes = "-" not in input_value
-        valid = all_lower and no_dashes
-        if valid:
+        if is_valid_project(input_value):
             return input_value
 
 
+def is_valid_project(value: str):
+    all_lower = value == value.lower()
+    no_dashes = "-" not in value
+    return all_lower and no_dashes
+
+
 def get_repo(default_value: str):
     msg = "What is the name of your GitHub repository?"
     prompt_text = f"Repository ({default_value}): "
@@ -97,34 +114,50 @@ def get_social_auth():
     return False if value.lower() in negations else True
 
 
+def get_fast_json():
+    msg = """Would you like to render and parse JSON with orjson? It’s much faster
+    than the standard library, and falls back to it if orjson isn’t installed."""
+    prompt_text = "Fast JSON? [Y/n]: "
+    negations = ["n", "no"]
+    value = prompt(cleandoc(msg), prompt_text)
+    return False if value.lower() in negations else True
+
+
+def get_asgi():
+    msg = """Would you like to serve your project with ASGI? If yes, production
+    runs uvicorn workers and the user and session API views are async, so slow
+    clients and sending email don’t tie up a worker. If no, it runs threaded
+    WSGI workers."""
+    prompt_text = "ASGI mode? [y/N]: "
+    affirmations = ["y", "yes"]
+    value = prompt(cleandoc(msg), prompt_text)
+    return True if value.lower() in affirmations else False
+
+
+def get_pgbouncer():
+    msg = """Would you like to run PgBouncer in front of PostgreSQL in production?
+    It pools database connections, so many workers can share a few of them.
+    It’s recommended in ASGI mode, where Django doesn’t keep connections open
+    between requests."""
+    prompt_text = "PgBouncer? [y/N]: "
+    affirmations = ["y", "yes"]
+    value = prompt(cleandoc(msg), prompt_text)
+    return True if value.lower() in affirmations else False
+
+
 def underscores_for_dashes(dashed: str):
     return dashed.replace("-", "_")
 
 
 def get_social_auth_providers():
-    providers = {
-        "Apple": "apple",
-        "Auth0": "auth0",
-        "Digital Ocean": "digitalocean",
-        "Discord": "discord",
-        "Facebook": "facebook",
-        "GitHub": "github",
-        "Google": "google",
-        "Instagram": "instagram",
-        "LinkedIn": "linkedin",
-        "Patreon": "patreon",
-        "Reddit": "reddit",
-        "Slack": "slack",
-        "Snapchat": "snap",
-        "Twitch": "twitch",
-    }
+    import inquirer
 
     questions = [
         inquirer.Checkbox(
             "providers",
             message="Which social authentication providers would you like to use?",
-            choices=providers.keys(),
+            choices=PROVIDERS.keys(),
         )
     ]
     answers = inquirer.prompt(questions)
-    return [providers[provider] for provider in answers["providers"]]
+    return [PROVIDERS[provider] for provider in answers["providers"]]
@@ -306,6 +306,70 @@ class TestGetSocialAuth:
         assert result is True
 
 
+class TestGetFastJson:
+    def test_shows_message(self, monkeypatch, capsys):
+        monkeypatch.setattr("builtins.input", lambda _: "")
+        prompts.get_fast_json()
+        captured = capsys.readouterr().out
+        assert "orjson" in captured
+
+    def test_defaults_true(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "x")
+        result = prompts.get_fast_json()
+        assert result is True
+
+    def test_takes_n(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "n")
+        result = prompts.get_fast_json()
+        assert result is False
+
+    def test_takes_no(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "No")
+        result = prompts.get_fast_json()
+        assert result is False
+
+
+class TestGetAsgi:
+    def test_shows_message(self, monkeypatch, capsys):
+        monkeypatch.setattr("builtins.input", lambda _: "")
+        prompts.get_asgi()
+        captured = capsys.readouterr().out
+        assert "ASGI" in captured
+
+    def test_defaults_false(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "x")
+        result = prompts.get_asgi()
+        assert result is False
+
+    def test_takes_y(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "y")
+        result = prompts.get_asgi()
+        assert result is True
+
+    def test_takes_yes(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "YeS")
+        result = prompts.get_asgi()
+        assert result is True
+
+
+class TestGetPgbouncer:
+    def test_shows_message(self, monkeypatch, capsys):
+        monkeypatch.setattr("builtins.input", lambda _: "")
+        prompts.get_pgbouncer()
+        captured = capsys.readouterr().out
+        assert "PgBouncer" in captured
+
+    def test_defaults_false(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "x")
+        result = prompts.get_pgbouncer()
+        assert result is False
+
+    def test_takes_yes(self, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "YeS")
+        result = prompts.get_pgbouncer()
+        assert result is True
+
+
 def test_underscores_for_dashes():
     actual = prompts.underscores_for_dashes("dashed-example-string")
     assert actual == "dashed_example_string"
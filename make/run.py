@@ -1,12 +1,61 @@
+import argparse
+import os
+import time
+
+import answers
 import files
 import messages
 import processes
 import prompts
 import repo
-from git import Repo
+import staging
+import tasks
+import tracing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORJSON = "orjson==3.9.7"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Start a new Django project.")
+    parser.add_argument(
+        "--answers",
+        metavar="PATH",
+        help="generate one project per answer set in a JSON, JSON Lines or YAML "
+        "file (use - to read JSON Lines from stdin) instead of prompting",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.json",
+        metavar="PATH",
+        help="write a JSON trace of every generation step (default: %(const)s)",
+    )
+    parser.add_argument(
+        "--chrome-trace",
+        metavar="PATH",
+        help="also write the trace as Chrome trace events (implies --profile)",
+    )
+    args = parser.parse_args(argv)
+
+    profile = args.profile or args.chrome_trace
+    if profile:
+        tracing.enable()
 
+    try:
+        if args.answers:
+            batch(args.answers)
+        else:
+            interactive()
+    finally:
+        if profile:
+            tracing.disable()
+            tracing.dump(args.profile or "profile.json", args.chrome_trace)
+
+
+def interactive():
+    from git import Repo
 
-def main():
     providers = []
     repository = Repo.init(".")
     url = repository.remotes.origin.url
@@ -23,36 +72,251 @@ def main():
         social_auth = prompts.get_social_auth()
         if social_auth:
             providers = prompts.get_social_auth_providers()
+    fast_json = prompts.get_fast_json()
+    asgi = prompts.get_asgi()
+    pgbouncer = prompts.get_pgbouncer()
+
+    steps, elapsed = generate(
+        project,
+        repository,
+        deployer,
+        users,
+        providers,
+        api_only,
+        fast_json,
+        asgi,
+        pgbouncer,
+    )
+    messages.print_timings(steps, elapsed)
+
+
+def batch(path: str):
+    templates = staging.Templates(ROOT)
+    cwd = os.getcwd()
+
+    for answer_set in answers.load(path):
+        options = answers.normalize(answer_set)
+        output = options.pop("output")
+        files.copy_starter(ROOT, output)
+
+        os.chdir(output)
+        try:
+            with tracing.span(f"generate ({options['project']})", "project"):
+                steps, elapsed = generate(**options, templates=templates)
+        finally:
+            os.chdir(cwd)
+
+        messages.print_bold(f"Generated {options['project']} in {output}")
+        messages.print_timings(steps, elapsed)
+
+
+def generate(
+    project,
+    repository,
+    deployer,
+    users,
+    providers,
+    api_only,
+    fast_json=True,
+    asgi=False,
+    pgbouncer=False,
+    templates=None,
+):
+    processes.create_django_project(project)
+    processes.create_users_app(users)
 
+    with staging.staged(templates):
+        start = time.perf_counter()
+        steps = tasks.run_tasks(
+            generation_tasks(
+                project,
+                repository,
+                deployer,
+                users,
+                providers,
+                api_only,
+                fast_json,
+                asgi,
+                pgbouncer,
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    return steps, elapsed
+
+
+def generation_tasks(
+    project,
+    repository,
+    deployer,
+    users,
+    providers,
+    api_only,
+    fast_json=True,
+    asgi=False,
+    pgbouncer=False,
+):
+    Task = tasks.Task
+    settings_file = f"./src/{project}/settings.py"
     environments = {
         "dev": {"debug": 1},
         "test": {"debug": 1},
         "prod": {"debug": 0},
     }
 
-    settings_file = f"./src/{project}/settings.py"
-
-    processes.create_django_project(project)
-    processes.create_users_app(users)
+    steps = [
+        Task(
+            "copy_files",
+            files.copy_files,
+            project,
+            users,
+            inputs=[
+                "make/.conftest.py",
+                "make/test.sh",
+                "make/templates",
+                "make/users",
+            ],
+            outputs=[
+                "src/conftest.py",
+                "src/test.sh",
+                f"src/{project}/templates",
+                f"src/{users}",
+            ],
+        ),
+        Task(
+            "change_settings",
+            files.change_settings,
+            settings_file,
+            users,
+            providers,
+            api_only=api_only,
+            fast_json=fast_json,
+            asgi=asgi,
+            inputs=[settings_file],
+            outputs=[settings_file],
+        ),
+        Task(
+            "change_urls",
+            files.change_urls,
+            project,
+            inputs=[f"src/{project}/urls.py"],
+            outputs=[f"src/{project}/urls.py"],
+        ),
+        Task(
+            "change_cd_workflow",
+            files.change_cd_workflow,
+            project,
+            deployer,
+            inputs=["cd.yml"],
+            outputs=[".github/workflows/cd.yml"],
+        ),
+        Task(
+            "change_dockerfile",
+            files.change_dockerfile,
+            project,
+            inputs=["docker/Dockerfile"],
+            outputs=["docker/Dockerfile"],
+        ),
+        Task(
+            "change_gunicorn_conf",
+            files.change_gunicorn_conf,
+            project,
+            asgi,
+            inputs=["make/gunicorn.conf.py"],
+            outputs=["src/gunicorn.conf.py"],
+        ),
+        Task(
+            "change_pytest_ini",
+            files.change_pytest_ini,
+            project,
+            inputs=["src/.pytest.ini"],
+            outputs=["src/pytest.ini"],
+        ),
+        Task("change_readme", files.change_readme, project, outputs=["README.md"]),
+        Task(
+            "change_scripts",
+            files.change_scripts,
+            project,
+            inputs=["up.sh", "down.sh"],
+            outputs=["up.sh", "down.sh"],
+        ),
+        Task(
+            "change_compose_prod",
+            files.change_compose_prod,
+            repository,
+            deployer,
+            "prod",
+            inputs=["docker/docker-compose.prod.yml"],
+            outputs=["docker/docker-compose.prod.yml"],
+        ),
+        Task(
+            "make_next",
+            files.make_next,
+            providers,
+            pgbouncer,
+            inputs=["next"],
+            outputs=["NEXT.md"],
+        ),
+    ]
 
-    files.copy_files(project, users)
-    files.change_settings(settings_file, users, providers, api_only=api_only)
-    files.exempt_long_lines(settings_file)
-    files.change_urls(project)
-    files.change_cd_workflow(project, deployer)
-    files.change_dockerfile(project)
-    files.change_pytest_ini(project)
-    files.change_readme(project)
-    files.change_scripts(project)
-    files.change_compose_prod(repository, deployer, "prod")
-    files.make_next(providers)
+    if fast_json:
+        steps.append(
+            Task(
+                "add_requirements",
+                files.add_requirements,
+                [ORJSON],
+                inputs=["src/requirements.txt"],
+                outputs=["src/requirements.txt"],
+            )
+        )
 
     for env in environments:
-        files.make_env(
-            env=env,
-            debug=environments[env]["debug"],
+        env_file = f"docker/.env.{env}"
+        steps.append(
+            Task(
+                f"make_env ({env})",
+                files.make_env,
+                env=env,
+                debug=environments[env]["debug"],
+                inputs=["docker/.env.example"],
+                outputs=[env_file],
+            )
+        )
+        steps.append(
+            Task(
+                f"add_provider_env ({env})",
+                files.add_provider_env,
+                providers,
+                env,
+                inputs=[env_file],
+                outputs=[env_file],
+            )
+        )
+
+    if pgbouncer:
+        pgbouncer_files = ["docker/docker-compose.prod.yml", "docker/.env.prod"]
+        steps.append(
+            Task(
+                "add_pgbouncer",
+                files.add_pgbouncer,
+                deployer,
+                inputs=pgbouncer_files,
+                outputs=pgbouncer_files,
+            )
+        )
+
+    for python_file in [settings_file, f"./src/{project}/urls.py"]:
+        steps.append(
+            Task(
+                f"format_python ({os.path.basename(python_file)})",
+                files.format_python,
+                python_file,
+                inputs=[python_file],
+                outputs=[python_file],
+            )
         )
-        files.add_provider_env(providers, env)
+
+    return steps
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+import json
+import os
+
+import pytest
+import run
+
+
+class TestGenerationTasks:
+    @pytest.fixture
+    def steps(self):
+        steps = run.generation_tasks(
+            "myproject", "user/repo", "deployer", "users", ["github"], False
+        )
+        return {step.name: step for step in steps}
+
+    def test_settings_before_format(self, steps):
+        format_settings = steps["format_python (settings.py)"]
+        assert format_settings.depends_on(steps["change_settings"])
+
+    def test_urls_before_format(self, steps):
+        assert steps["format_python (urls.py)"].depends_on(steps["change_urls"])
+
+    def test_make_env_before_add_provider_env(self, steps):
+        add_provider_env = steps["add_provider_env (dev)"]
+        assert add_provider_env.depends_on(steps["make_env (dev)"])
+
+    def test_envs_independent(self, steps):
+        assert not steps["make_env (prod)"].depends_on(steps["make_env (dev)"])
+
+    def test_copy_files_independent_of_settings(self, steps):
+        assert not steps["change_settings"].depends_on(steps["copy_files"])
+
+    def test_asgi_settings(self):
+        steps = run.generation_tasks(
+            "myproject", "user/repo", "deployer", "users", [], False, True, True
+        )
+        steps = {step.name: step for step in steps}
+        assert steps["change_settings"].kwargs["asgi"] is True
+        assert steps["change_gunicorn_conf"].args == ("myproject", True)
+
+    def test_pgbouncer_after_env(self):
+        steps = run.generation_tasks(
+            "myproject", "user/repo", "deployer", "users", [], False, True, False, True
+        )
+        steps = {step.name: step for step in steps}
+        add_pgbouncer = steps["add_pgbouncer"]
+        assert add_pgbouncer.depends_on(steps["make_env (prod)"])
+        assert add_pgbouncer.depends_on(steps["change_compose_prod"])
+
+    def test_no_pgbouncer(self, steps):
+        assert "add_pgbouncer" not in steps
+
+    def test_adds_orjson(self, steps):
+        assert steps["add_requirements"].args == ([run.ORJSON],)
+
+    def test_skips_orjson(self):
+        steps = run.generation_tasks(
+            "myproject", "user/repo", "deployer", "users", [], False, False
+        )
+        assert "add_requirements" not in {step.name for step in steps}
+
+
+class TestBatch:
+    @pytest.fixture
+    def generated(self, tmp_path, monkeypatch):
+        calls = []
+
+        def generate(**kwargs):
+            calls.append((os.getcwd(), kwargs))
+            return [], 0
+
+        monkeypatch.setattr(run, "generate", generate)
+        monkeypatch.setattr(run.files, "copy_starter", lambda root, dest: None)
+        monkeypatch.chdir(tmp_path)
+        for project in ["first", "second"]:
+            (tmp_path / project).mkdir()
+        path = tmp_path / "answers.jsonl"
+        lines = [
+            {"project": project, "repository": "user/repo", "deployer": "ops"}
+            for project in ["first", "second"]
+        ]
+        path.write_text("\n".join(json.dumps(line) for line in lines))
+        run.main(["--answers", str(path)])
+        return calls, tmp_path
+
+    def test_generates_each_project(self, generated):
+        calls, _ = generated
+        assert [kwargs["project"] for _, kwargs in calls] == ["first", "second"]
+
+    def test_generates_in_output(self, generated):
+        calls, tmp_path = generated
+        assert calls[0][0] == str(tmp_path / "first")
+
+    def test_restores_cwd(self, generated):
+        _, tmp_path = generated
+        assert os.getcwd() == str(tmp_path)
+
+    def test_shares_templates(self, generated):
+        calls, _ = generated
+        assert calls[0][1]["templates"] is calls[1][1]["templates"]
+
+
+class TestProfile:
+    @pytest.fixture(autouse=True)
+    def interactive(self, monkeypatch):
+        def interactive():
+            with run.tracing.span("step"):
+                pass
+
+        monkeypatch.setattr(run, "interactive", interactive)
+        yield
+        run.tracing.spans.clear()
+
+    def test_profile(self, tmp_path):
+        path = tmp_path / "profile.json"
+        run.main(["--profile", str(path)])
+        spans = json.loads(path.read_text())["spans"]
+        assert [span["name"] for span in spans] == ["step"]
+        assert not run.tracing.enabled
+
+    def test_chrome_trace(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        run.main(["--chrome-trace", "chrome.json"])
+        assert (tmp_path / "profile.json").exists()
+        events = json.loads((tmp_path / "chrome.json").read_text())["traceEvents"]
+        assert [event["name"] for event in events] == ["step"]
+
+    def test_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        run.main([])
+        assert not (tmp_path / "profile.json").exists()
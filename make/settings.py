@@ -1,13 +1,100 @@
 import os
-import re
+from functools import wraps
 
-import black
 
+class SettingsTree:
+    def __init__(self, source: str):
+        import libcst as cst
+
+        module = cst.parse_module(source)
+        self.module = module.with_changes(body=())
+        self.body = list(module.body)
+
+    @property
+    def code(self):
+        return self.module.with_changes(body=self.body).code
+
+    def code_for(self, node):
+        return self.module.code_for_node(node).strip()
+
+    def find(self, name: str):
+        import libcst as cst
+
+        for index, statement in enumerate(self.body):
+            if not isinstance(statement, cst.SimpleStatementLine):
+                continue
+            small = statement.body[0]
+            if not isinstance(small, cst.Assign) or len(small.targets) != 1:
+                continue
+            target = small.targets[0].target
+            if isinstance(target, cst.Name) and target.value == name:
+                return index
+        return None
+
+    def find_code(self, code: str):
+        for index, statement in enumerate(self.body):
+            if self.code_for(statement) == code:
+                return index
+        return None
+
+    def value(self, index: int):
+        return self.body[index].body[0].value
+
+    def set_value(self, index: int, code: str):
+        import libcst as cst
+
+        statement = self.body[index]
+        assign = statement.body[0].with_changes(value=cst.parse_expression(code))
+        self.body[index] = statement.with_changes(body=[assign])
+
+    def replace_node(self, index: int, old, new):
+        self.body[index] = self.body[index].deep_replace(old, new)
+
+    def replace(self, index: int, code: str):
+        statements = parse_statements(code)
+        leading_lines = self.body[index].leading_lines
+        statements[0] = statements[0].with_changes(leading_lines=leading_lines)
+        end = index + 1
+        self.body[index:end] = statements
+
+    def insert(self, index: int, code: str, blank_line: bool = True):
+        statements = parse_statements(code, blank_line=blank_line)
+        self.body[index:index] = statements
+
+    def append(self, code: str):
+        self.module = self.module.with_changes(has_trailing_newline=True)
+        self.insert(len(self.body), code)
+
+
+def parse_statements(code: str, blank_line: bool = False):
+    import libcst as cst
+
+    statements = list(cst.parse_module(code).body)
+    leading_lines = [cst.EmptyLine()] if blank_line else []
+    statements[0] = statements[0].with_changes(leading_lines=leading_lines)
+    return statements
+
+
+def transform(edit):
+    @wraps(edit)
+    def wrapper(settings, *args, **kwargs):
+        if isinstance(settings, SettingsTree):
+            edit(settings, *args, **kwargs)
+            return settings
+
+        tree = SettingsTree(settings)
+        edit(tree, *args, **kwargs)
+        return tree.code
+
+    return wrapper
+
+
+@transform
+def add_installed_apps(settings: SettingsTree, users: str, providers=None):
+    import libcst as cst
 
-def add_installed_apps(settings: str, users: str, providers=None):
     apps_to_mix = ['"django.contrib.sites"']
     apps_to_add = [
-        '"django.contrib.sites"',
         '"rest_framework"',
         '"rest_framework.authtoken"',
         '"allauth"',
@@ -26,22 +113,29 @@ def add_installed_apps(settings: str, users: str, providers=None):
         f'"{users}"',
     ]
 
-    match = re.search(r"INSTALLED_APPS = \[(.*?)]", settings, flags=re.DOTALL)
-    if not match:
-        return settings
-    apps_existing_str = match.group(1).strip()
-    apps_existing = [app.strip() for app in apps_existing_str.split(",") if app]
-    apps = sorted(apps_existing + apps_to_mix) + apps_to_add
+    index = settings.find("INSTALLED_APPS")
+    if index is None or not isinstance(settings.value(index), cst.List):
+        return
+    elements = settings.value(index).elements
+    apps_existing = [settings.code_for(element.value) for element in elements]
+    apps = list(dict.fromkeys(sorted(apps_existing + apps_to_mix) + apps_to_add))
     apps_str = ",\n    ".join(apps)
-    installed_str = f"INSTALLED_APPS = [\n    {apps_str},\n]"
-    return settings.replace(match.group(0), installed_str)
+    settings.replace(index, f"INSTALLED_APPS = [\n    {apps_str},\n]\n")
+
 
+@transform
+def change_database_settings(settings: SettingsTree, asgi: bool = False):
+    import libcst as cst
 
-def change_database_settings(settings: str):
-    pattern = r"DATABASES = {(\s*)['|\"]default['|\"]: {([\S\s]*?)\n\}"
-    match_databases = re.search(pattern, settings, flags=re.DOTALL)
-    if not match_databases:
-        return settings
+    index = settings.find("DATABASES")
+    if index is None or not isinstance(settings.value(index), cst.Dict):
+        return
+    conn_max_age = 0 if asgi else 60
+    connection_settings = [
+        f'"CONN_MAX_AGE": int(os.environ.get("SQL_CONN_MAX_AGE") or {conn_max_age}),',
+        '"CONN_HEALTH_CHECKS": os.environ.get("SQL_CONN_HEALTH_CHECKS", "1") == "1",',
+        '"DISABLE_SERVER_SIDE_CURSORS": os.environ.get("SQL_PGBOUNCER") == "1",',
+    ]
     databases = """if TESTING:
     DATABASES = {
         "default": {
@@ -60,106 +154,203 @@ else:
             "PASSWORD": os.environ.get("SQL_PASSWORD", "password"),
             "HOST": os.environ.get("SQL_HOST", "localhost"),
             "PORT": os.environ.get("SQL_PORT", "5432"),
-        }
+"""
+    databases += "".join(f"            {line}\n" for line in connection_settings)
+    databases += """        }
     }
 """
-
-    return settings.replace(match_databases.group(0), databases)
-
-
-def set_project_template_dir(settings: str):
-    templates_pattern = r"TEMPLATES = \[(\s*){[\s\S]*},?(\s)*]"
-    match_templates = re.search(templates_pattern, settings, flags=re.DOTALL)
-    if not match_templates:
-        return settings
-    dirs_pattern = r"['|\"]DIRS['|\"]: \[\]"
-    match_dirs = re.search(dirs_pattern, match_templates.group(0), flags=re.DOTALL)
-    if not match_dirs:
-        return settings
-    dirs_update = '"DIRS": [BASE_DIR / "templates"]'
-    updated_templates = match_templates.group(0).replace("'DIRS': []", dirs_update)
-    updated_templates = updated_templates.replace('"DIRS": []', dirs_update)
-    return settings.replace(match_templates.group(0), updated_templates)
-
-
-def add_new_settings(settings: str, users: str, api_only: bool = False):
-    new_settings_anchor = "from pathlib import Path"
+    settings.replace(index, databases)
+
+
+@transform
+def set_project_template_dir(settings: SettingsTree):
+    import libcst as cst
+
+    index = settings.find("TEMPLATES")
+    if index is None or not isinstance(settings.value(index), cst.List):
+        return
+    for template in settings.value(index).elements:
+        if not isinstance(template.value, cst.Dict):
+            continue
+        for element in template.value.elements:
+            is_dirs = getattr(element.key, "evaluated_value", None) == "DIRS"
+            is_empty = (
+                isinstance(element.value, cst.List) and not element.value.elements
+            )
+            if is_dirs and is_empty:
+                dirs = element.with_changes(
+                    key=cst.parse_expression('"DIRS"'),
+                    value=cst.parse_expression('[BASE_DIR / "templates"]'),
+                )
+                settings.replace_node(index, element, dirs)
+
+
+@transform
+def add_new_settings(
+    settings: SettingsTree, users: str, api_only: bool = False, asgi: bool = False
+):
+    anchor = settings.find_code("from pathlib import Path")
+    if anchor is None:
+        return
     api_base = "v1/" if api_only else "api/v1/"
+    permission_cache_ttl = 'int(os.environ.get("USER_PERMISSION_CACHE_TTL") or 0)'
+    max_attempts = 'int(os.environ.get("EMAIL_QUEUE_MAX_ATTEMPTS") or 5)'
+    token_cache_ttl = 'int(os.environ.get("TOKEN_CACHE_TTL") or 0)'
+    token_cache_alias = 'os.environ.get("TOKEN_CACHE_ALIAS") or "default"'
+    console_backend = "django.core.mail.backends.console.EmailBackend"
+    delivery_backend = 'os.environ.get("EMAIL_DELIVERY_BACKEND")'
     new_settings = [
         f'AUTH_USER_MODEL = "{users}.UserAccount"',
         "SITE_ID = 1",
         f'API_BASE = "{api_base}"',
         "USER_DETAILS_PUBLIC = False",
+        f"ASYNC_API_VIEWS = {asgi}",
+        f"USER_PERMISSION_CACHE_TTL = {permission_cache_ttl}",
+        f"TOKEN_CACHE_TTL = {token_cache_ttl}",
+        f"TOKEN_CACHE_ALIAS = {token_cache_alias}",
         'ACCOUNT_EMAIL_VERIFICATION = "mandatory"',
         "ACCOUNT_EMAIL_REQUIRED = True",
         'ACCOUNT_AUTHENTICATION_METHOD = "username_email"',
-        'EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"',
+        f'EMAIL_BACKEND = "{users}.mail.QueuedEmailBackend"',
+        f'EMAIL_DELIVERY_BACKEND = {delivery_backend} or "{console_backend}"',
+        'EMAIL_HOST = os.environ.get("EMAIL_HOST") or "localhost"',
+        'EMAIL_PORT = int(os.environ.get("EMAIL_PORT") or 25)',
+        'EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")',
+        'EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")',
+        'EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS") == "1"',
+        f"EMAIL_QUEUE_MAX_ATTEMPTS = {max_attempts}",
     ]
     if not api_only:
         new_settings.append('LOGIN_REDIRECT_URL = "home"')
         new_settings.append('LOGOUT_REDIRECT_URL = "home"')
-    new_settings_string = (
-        new_settings_anchor
-        + os.linesep
-        + os.linesep
-        + os.linesep.join(new_settings)
-        + os.linesep
-    )
-    return settings.replace(new_settings_anchor, new_settings_string)
+    settings.insert(anchor + 1, os.linesep.join(new_settings) + os.linesep)
 
 
-def add_import_os(settings: str):
-    anchor = "from pathlib import Path"
-    replacement = "import os" + os.linesep + anchor
-    return settings.replace(anchor, replacement)
+@transform
+def add_import_os(settings: SettingsTree):
+    anchor = settings.find_code("from pathlib import Path")
+    if anchor is None:
+        return
+    settings.replace(anchor, "import os\nfrom pathlib import Path\n")
 
 
-def set_secret_key(settings: str):
-    find = r'SECRET_KEY = "(.*)"'
-    replacement = 'SECRET_KEY = os.environ.get("SECRET_KEY")'
-    return re.sub(find, replacement, settings)
+@transform
+def set_secret_key(settings: SettingsTree):
+    import libcst as cst
 
+    index = settings.find("SECRET_KEY")
+    if index is not None and isinstance(settings.value(index), cst.SimpleString):
+        settings.set_value(index, 'os.environ.get("SECRET_KEY")')
 
-def set_debug(settings: str):
-    find = r"DEBUG = (.*)\n"
+
+@transform
+def set_debug(settings: SettingsTree):
+    index = settings.find("DEBUG")
+    if index is None:
+        return
     lines = [
         'DEBUG = int(os.environ.get("DEBUG", default=1))',
         'TESTING = os.environ.get("DJANGO_TESTING") == "1"',
     ]
-    replacement = os.linesep.join(lines)
-    return re.sub(find, replacement, settings)
-
-
-def set_allowed_hosts(settings: str):
-    find = r"ALLOWED_HOSTS = \[\]"
-    replacement = 'ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS").split(" ")'
-    return re.sub(find, replacement, settings)
-
-
-def add_prod_rest_framework_renderer(settings: str):
-    addendum = """if not DEBUG:
-    REST_FRAMEWORK[
-        "DEFAULT_RENDERER_CLASSES"
-    ] = "rest_framework.renderers.JSONRenderer"
+    settings.replace(index, os.linesep.join(lines) + os.linesep)
+
+
+@transform
+def set_allowed_hosts(settings: SettingsTree):
+    import libcst as cst
+
+    index = settings.find("ALLOWED_HOSTS")
+    if index is None:
+        return
+    value = settings.value(index)
+    if isinstance(value, cst.List) and not value.elements:
+        replacement = 'os.environ.get("DJANGO_ALLOWED_HOSTS").split(" ")'
+        settings.set_value(index, replacement)
+
+
+@transform
+def add_rest_framework(settings: SettingsTree, users: str, fast_json: bool = True):
+    if fast_json:
+        renderer = f"{users}.renderers.ORJSONRenderer"
+        parser = f"{users}.renderers.ORJSONParser"
+    else:
+        renderer = "rest_framework.renderers.JSONRenderer"
+        parser = "rest_framework.parsers.JSONParser"
+
+    addendum = f"""REST_FRAMEWORK = {{
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "{users}.authentication.CachedTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "{renderer}",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "{parser}",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}}
+
+if not DEBUG:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = ["{renderer}"]
 """
-    return settings + os.linesep + os.linesep + addendum
+    index = settings.find("REST_FRAMEWORK")
+    if index is None:
+        settings.append(addendum)
+    else:
+        settings.replace(index, addendum)
 
 
-def add_authentication_backends(settings: str):
+@transform
+def add_authentication_backends(settings: SettingsTree):
     addendum = """AUTHENTICATION_BACKENDS = (
     "django.contrib.auth.backends.ModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
 )
 """
-    return settings + os.linesep + os.linesep + addendum
+    settings.append(addendum)
+
+
+@transform
+def add_password_hashers(settings: SettingsTree, users: str):
+    addendum = f"""PASSWORD_HASHERS = [
+    "{users}.hashing.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS") or 0)
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS") or 0)
+PASSWORD_HASHING_QUEUE = int(os.environ.get("PASSWORD_HASHING_QUEUE") or 32)
+"""
+    settings.append(addendum)
+
+
+@transform
+def add_test_settings(settings: SettingsTree):
+    addendum = """if TESTING:
+    PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        *PASSWORD_HASHERS,
+    ]
+    EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+"""
+    settings.append(addendum)
 
 
-def remove_password_validators(settings: str):
-    pattern = r"AUTH_PASSWORD_VALIDATORS = \[[\s\S]*?]"
-    return re.sub(pattern, "AUTH_PASSWORD_VALIDATORS = []", settings)
+@transform
+def remove_password_validators(settings: SettingsTree):
+    index = settings.find("AUTH_PASSWORD_VALIDATORS")
+    if index is not None:
+        settings.set_value(index, "[]")
 
 
-def add_social_auth_providers(settings: str, providers: dict):
+@transform
+def add_social_auth_providers(settings: SettingsTree, providers: dict):
     addendum = "SOCIALACCOUNT_PROVIDERS = {" + os.linesep
     for provider in providers:
         prefix = "SNAPCHAT" if provider == "snap" else provider.upper()
@@ -226,6 +417,4 @@ def add_social_auth_providers(settings: str, providers: dict):
         addendum += "},"
     addendum += "}"
 
-    return black.format_str(
-        settings + os.linesep + os.linesep + addendum, mode=black.FileMode()
-    )
+    settings.append(addendum + os.linesep)
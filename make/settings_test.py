@@ -1,3 +1,6 @@
+from pathlib import Path
+
+import files
 import pytest
 import settings
 
@@ -189,6 +192,9 @@ else:
             "PASSWORD": os.environ.get("SQL_PASSWORD", "password"),
             "HOST": os.environ.get("SQL_HOST", "localhost"),
             "PORT": os.environ.get("SQL_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.environ.get("SQL_CONN_MAX_AGE") or 60),
+            "CONN_HEALTH_CHECKS": os.environ.get("SQL_CONN_HEALTH_CHECKS", "1") == "1",
+            "DISABLE_SERVER_SIDE_CURSORS": os.environ.get("SQL_PGBOUNCER") == "1",
         }
     }
 """
@@ -198,6 +204,10 @@ else:
         actual, expected = setup
         assert expected in actual
 
+    def test_asgi_closes_connections(self):
+        actual = settings.change_database_settings(test_example, asgi=True)
+        assert 'int(os.environ.get("SQL_CONN_MAX_AGE") or 0)' in actual
+
     def test_does_not_eat_next_section(self, setup):
         actual, _ = setup
         assert "TEMPLATES = [" in actual
@@ -234,6 +244,29 @@ class TestAddNewSettings:
         actual = settings.add_new_settings(test_example, "users", api_only=True)
         assert "USER_DETAILS_PUBLIC = False" in actual
 
+    def test_sync_api_views(self):
+        actual = settings.add_new_settings(test_example, "users")
+        assert "ASYNC_API_VIEWS = False" in actual
+
+    def test_async_api_views(self):
+        actual = settings.add_new_settings(test_example, "users", asgi=True)
+        assert "ASYNC_API_VIEWS = True" in actual
+
+    def test_user_permission_cache_ttl(self):
+        actual = settings.add_new_settings(test_example, "users")
+        expected = 'os.environ.get("USER_PERMISSION_CACHE_TTL") or 0'
+        assert f"USER_PERMISSION_CACHE_TTL = int({expected})" in actual
+
+    def test_token_cache_ttl(self):
+        actual = settings.add_new_settings(test_example, "users")
+        expected = 'os.environ.get("TOKEN_CACHE_TTL") or 0'
+        assert f"TOKEN_CACHE_TTL = int({expected})" in actual
+
+    def test_token_cache_alias(self):
+        actual = settings.add_new_settings(test_example, "users")
+        expected = 'os.environ.get("TOKEN_CACHE_ALIAS") or "default"'
+        assert f"TOKEN_CACHE_ALIAS = {expected}" in actual
+
     def test_email_verification(self):
         actual = settings.add_new_settings(test_example, "users", api_only=True)
         assert 'ACCOUNT_EMAIL_VERIFICATION = "mandatory"' in actual
@@ -247,9 +280,18 @@ class TestAddNewSettings:
         assert 'ACCOUNT_AUTHENTICATION_METHOD = "username_email"' in actual
 
     def test_email_backend(self):
+        actual = settings.add_new_settings(test_example, "users", api_only=True)
+        assert 'EMAIL_BACKEND = "users.mail.QueuedEmailBackend"' in actual
+
+    def test_email_delivery_backend(self):
         actual = settings.add_new_settings(test_example, "users", api_only=True)
         backend = "django.core.mail.backends.console.EmailBackend"
-        assert f'EMAIL_BACKEND = "{backend}"' in actual
+        expected = f'os.environ.get("EMAIL_DELIVERY_BACKEND") or "{backend}"'
+        assert f"EMAIL_DELIVERY_BACKEND = {expected}" in actual
+
+    def test_email_host(self):
+        actual = settings.add_new_settings(test_example, "users", api_only=True)
+        assert 'EMAIL_HOST = os.environ.get("EMAIL_HOST") or "localhost"' in actual
 
     def test_login_redirect(self):
         actual = settings.add_new_settings(test_example, "users")
@@ -294,14 +336,84 @@ def test_set_allowed_hosts():
     assert expected in actual
 
 
-def test_add_prod_rest_framework():
-    actual = settings.add_prod_rest_framework_renderer(test_example)
-    expected = """if not DEBUG:
-    REST_FRAMEWORK[
-        "DEFAULT_RENDERER_CLASSES"
-    ] = "rest_framework.renderers.JSONRenderer"
+class TestAddRestFramework:
+    def test_defines_rest_framework(self):
+        actual = settings.add_rest_framework(test_example, "users")
+        assert "REST_FRAMEWORK = {" in actual
+
+    def test_cached_token_authentication(self):
+        source = "DEBUG = 1\n"
+        actual = settings.add_rest_framework(source, "users")
+        namespace = {}
+        exec(actual, namespace)
+        classes = namespace["REST_FRAMEWORK"]["DEFAULT_AUTHENTICATION_CLASSES"]
+        assert classes[0] == "users.authentication.CachedTokenAuthentication"
+        assert "rest_framework.authentication.SessionAuthentication" in classes
+
+    def test_fast_json(self):
+        actual = settings.add_rest_framework(test_example, "users")
+        assert '"users.renderers.ORJSONRenderer",' in actual
+        assert '"users.renderers.ORJSONParser",' in actual
+
+    def test_stdlib_json(self):
+        actual = settings.add_rest_framework(test_example, "users", fast_json=False)
+        assert '"rest_framework.renderers.JSONRenderer",' in actual
+        assert '"rest_framework.parsers.JSONParser",' in actual
+        assert "ORJSON" not in actual
+
+    def test_prod_renderer(self):
+        actual = settings.add_rest_framework(test_example, "users")
+        expected = """if not DEBUG:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = ["users.renderers.ORJSONRenderer"]
 """
-    assert expected in actual
+        assert expected in actual
+
+    def test_defined_before_use(self):
+        source = test_example.replace("DEBUG = True", "DEBUG = False")
+        actual = settings.add_rest_framework(source, "users")
+        namespace = {"BASE_DIR": Path(".")}
+        exec(actual, namespace)
+        renderers = namespace["REST_FRAMEWORK"]["DEFAULT_RENDERER_CLASSES"]
+        assert renderers == ["users.renderers.ORJSONRenderer"]
+
+    def test_replaces_existing(self):
+        source = test_example + "\n\nREST_FRAMEWORK = {}\n"
+        actual = settings.add_rest_framework(source, "users")
+        assert actual.count("REST_FRAMEWORK = {") == 1
+        assert "REST_FRAMEWORK = {}" not in actual
+
+
+class TestAddPasswordHashers:
+    def test_tuned_hasher_first(self):
+        actual = settings.add_password_hashers(test_example, "users")
+        expected = """PASSWORD_HASHERS = [
+    "users.hashing.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+"""
+        assert expected in actual
+        assert "hashers.PBKDF2PasswordHasher" not in actual
+
+    def test_hashing_settings(self):
+        actual = settings.add_password_hashers(test_example, "users")
+        for name, default in [
+            ("PASSWORD_HASH_ITERATIONS", 0),
+            ("PASSWORD_HASHING_WORKERS", 0),
+            ("PASSWORD_HASHING_QUEUE", 32),
+        ]:
+            expected = f'int(os.environ.get("{name}") or {default})'
+            assert f"{name} = {expected}" in actual
+
+
+def test_add_test_settings():
+    source = settings.add_password_hashers(test_example, "users")
+    actual = settings.add_test_settings(source)
+    namespace = {"BASE_DIR": Path("."), "TESTING": True}
+    exec("import os\n" + actual, namespace)
+    assert namespace["PASSWORD_HASHERS"][:2] == [
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        "users.hashing.TunedPBKDF2PasswordHasher",
+    ]
+    assert namespace["EMAIL_BACKEND"].endswith("locmem.EmailBackend")
 
 
 def test_add_authentication_backends():
@@ -322,9 +434,15 @@ def test_remove_password_validators():
     assert "TEMPLATES = [" in actual
 
 
+def add_providers(providers: list):
+    return files.format_source(
+        settings.add_social_auth_providers(test_example, providers)
+    )
+
+
 class TestAddSocialAuthProviders:
     def test_apple(self):
-        actual = settings.add_social_auth_providers(test_example, ["apple"])
+        actual = add_providers(["apple"])
         assert '"apple": {' in actual
         assert '"client_id": os.environ.get("APPLE_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("APPLE_SECRET"),' in actual
@@ -333,7 +451,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_auth0(self):
-        actual = settings.add_social_auth_providers(test_example, ["auth0"])
+        actual = add_providers(["auth0"])
         assert '"auth0": {' in actual
         assert '"client_id": os.environ.get("AUTH0_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("AUTH0_SECRET"),' in actual
@@ -343,7 +461,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_digitalocean(self):
-        actual = settings.add_social_auth_providers(test_example, ["digitalocean"])
+        actual = add_providers(["digitalocean"])
         assert '"digitalocean": {' in actual
         assert '"client_id": os.environ.get("DIGITALOCEAN_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("DIGITALOCEAN_SECRET"),' in actual
@@ -351,7 +469,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_discord(self):
-        actual = settings.add_social_auth_providers(test_example, ["discord"])
+        actual = add_providers(["discord"])
         assert '"discord": {' in actual
         assert '"client_id": os.environ.get("DISCORD_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("DISCORD_SECRET"),' in actual
@@ -359,7 +477,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_facebook(self):
-        actual = settings.add_social_auth_providers(test_example, ["facebook"])
+        actual = add_providers(["facebook"])
         assert '"facebook": {' in actual
         assert '"client_id": os.environ.get("FACEBOOK_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("FACEBOOK_SECRET"),' in actual
@@ -378,7 +496,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["email", "public_profile"],' in actual
 
     def test_github(self):
-        actual = settings.add_social_auth_providers(test_example, ["github"])
+        actual = add_providers(["github"])
         assert '"github": {' in actual
         assert '"client_id": os.environ.get("GITHUB_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("GITHUB_SECRET"),' in actual
@@ -386,7 +504,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["user"],' in actual
 
     def test_google(self):
-        actual = settings.add_social_auth_providers(test_example, ["google"])
+        actual = add_providers(["google"])
         assert '"google": {' in actual
         assert '"client_id": os.environ.get("GOOGLE_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("GOOGLE_SECRET"),' in actual
@@ -396,7 +514,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["profile", "email"],' in actual
 
     def test_instagram(self):
-        actual = settings.add_social_auth_providers(test_example, ["instagram"])
+        actual = add_providers(["instagram"])
         assert '"instagram": {' in actual
         assert '"client_id": os.environ.get("INSTAGRAM_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("INSTAGRAM_SECRET"),' in actual
@@ -404,7 +522,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_linkedin(self):
-        actual = settings.add_social_auth_providers(test_example, ["linkedin"])
+        actual = add_providers(["linkedin"])
         assert '"linkedin": {' in actual
         assert '"client_id": os.environ.get("LINKEDIN_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("LINKEDIN_SECRET"),' in actual
@@ -419,7 +537,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["r_basicprofile", "r_emailaddress"],' in actual
 
     def test_patreon(self):
-        actual = settings.add_social_auth_providers(test_example, ["patreon"])
+        actual = add_providers(["patreon"])
         assert '"patreon": {' in actual
         assert '"client_id": os.environ.get("PATREON_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("PATREON_SECRET"),' in actual
@@ -432,7 +550,7 @@ class TestAddSocialAuthProviders:
         assert '"campaigns.members"' in actual
 
     def test_reddit(self):
-        actual = settings.add_social_auth_providers(test_example, ["reddit"])
+        actual = add_providers(["reddit"])
         assert '"reddit": {' in actual
         assert '"client_id": os.environ.get("REDDIT_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("REDDIT_SECRET"),' in actual
@@ -442,7 +560,7 @@ class TestAddSocialAuthProviders:
         assert '"USER_AGENT": "django:myappid:1.0 (by /u/"' in actual
 
     def test_slack(self):
-        actual = settings.add_social_auth_providers(test_example, ["slack"])
+        actual = add_providers(["slack"])
         assert '"slack": {' in actual
         assert '"client_id": os.environ.get("SLACK_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("SLACK_SECRET"),' in actual
@@ -450,7 +568,7 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_snapchat(self):
-        actual = settings.add_social_auth_providers(test_example, ["snap"])
+        actual = add_providers(["snap"])
         assert '"snap": {' in actual
         assert '"client_id": os.environ.get("SNAPCHAT_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("SNAPCHAT_SECRET"),' in actual
@@ -458,9 +576,56 @@ class TestAddSocialAuthProviders:
         assert '"SCOPE": ["read"],' in actual
 
     def test_twitch(self):
-        actual = settings.add_social_auth_providers(test_example, ["twitch"])
+        actual = add_providers(["twitch"])
         assert '"twitch": {' in actual
         assert '"client_id": os.environ.get("TWITCH_CLIENT_ID"),' in actual
         assert '"secret": os.environ.get("TWITCH_SECRET"),' in actual
         assert '"key": os.environ.get("TWITCH_KEY"),' in actual
         assert '"SCOPE": ["read"],' in actual
+
+
+class TestSettingsTree:
+    def test_round_trip(self):
+        assert settings.SettingsTree(test_example).code == test_example
+
+    def test_keeps_comments(self):
+        source = test_example.replace(
+            "SECRET_KEY", "# SECURITY WARNING: keep it secret\nSECRET_KEY"
+        )
+        actual = settings.set_secret_key(source)
+        assert "# SECURITY WARNING: keep it secret\nSECRET_KEY = os" in actual
+
+    def test_edits_in_place(self):
+        tree = settings.SettingsTree(test_example)
+        assert settings.set_secret_key(tree) is tree
+        assert 'SECRET_KEY = os.environ.get("SECRET_KEY")' in tree.code
+
+    def test_ignores_nested_names(self):
+        source = "if True:\n    SECRET_KEY = 'secret'\n"
+        assert settings.set_secret_key(source) == source
+
+    def test_ignores_string_contents(self):
+        source = 'NOTE = """\nDEBUG = True\n"""\n'
+        assert settings.set_debug(source) == source
+
+    @pytest.mark.parametrize(
+        "edit",
+        [
+            settings.add_import_os,
+            settings.change_database_settings,
+            settings.set_allowed_hosts,
+            settings.set_debug,
+            settings.set_project_template_dir,
+            settings.set_secret_key,
+        ],
+    )
+    def test_missing_target(self, edit):
+        source = "X = 1\n"
+        assert edit(source) == source
+
+    def test_installs_sites_once(self):
+        source = test_example.replace(
+            '"previously_installed"', '"django.contrib.sites"'
+        )
+        actual = settings.add_installed_apps(source, "users")
+        assert actual.count('"django.contrib.sites"') == 1
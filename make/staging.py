@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import tracing
+
+active = None
+
+
+def current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+class Templates:
+    def __init__(self, root: str, paths=("make", "next", "cd.yml")):
+        self.root = os.path.abspath(root)
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.contents = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, key: str):
+        return any(key == path or key.startswith(path + os.sep) for path in self.paths)
+
+    def read(self, key: str):
+        with self.lock:
+            if key not in self.contents:
+                with open(os.path.join(self.root, key)) as file:
+                    self.contents[key] = file.read()
+            return self.contents[key]
+
+
+class Stage:
+    def __init__(self, templates: Templates = None):
+        self.buffers = {}
+        self.written = []
+        self.templates = templates
+        self.lock = threading.RLock()
+
+    def read(self, path: str):
+        key = os.path.normpath(path)
+        with self.lock:
+            if key not in self.buffers:
+                if self.templates is not None and key in self.templates:
+                    self.buffers[key] = self.templates.read(key)
+                else:
+                    with open(path) as file:
+                        self.buffers[key] = file.read()
+            return self.buffers[key]
+
+    def write(self, path: str, contents: str):
+        key = os.path.normpath(path)
+        with self.lock:
+            self.buffers[key] = contents
+            if key not in self.written:
+                self.written.append(key)
+
+    def flush(self):
+        pending = []
+        try:
+            for key in self.written:
+                pending.append((self.write_temp(key), key))
+        except BaseException:
+            for temp, _ in pending:
+                os.remove(temp)
+            raise
+
+        for temp, key in pending:
+            os.replace(temp, key)
+        self.written = []
+
+    def write_temp(self, key: str):
+        directory = os.path.dirname(key) or "."
+        os.makedirs(directory, exist_ok=True)
+        prefix = f".{os.path.basename(key)}."
+        handle, temp = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w") as file:
+                file.write(self.buffers[key])
+            if os.path.exists(key):
+                shutil.copymode(key, temp)
+            else:
+                os.chmod(temp, 0o666 & ~current_umask())
+        except BaseException:
+            os.remove(temp)
+            raise
+        return temp
+
+
+@contextmanager
+def staged(templates: Templates = None):
+    global active
+    stage = Stage(templates)
+    active = stage
+    try:
+        yield stage
+        with tracing.span("flush", "io"):
+            stage.flush()
+    finally:
+        active = None
+
+
+def read(path: str):
+    if active is not None:
+        return active.read(path)
+
+    with open(path) as file:
+        return file.read()
+
+
+def write(path: str, contents: str):
+    if active is not None:
+        active.write(path, contents)
+        return
+
+    with open(path, "w") as file:
+        file.write(contents)
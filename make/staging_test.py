@@ -0,0 +1,110 @@
+import os
+import stat
+
+import pytest
+import staging
+
+
+@pytest.fixture
+def tmp_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestUnstaged:
+    def test_read(self, tmp_cwd):
+        (tmp_cwd / "in.txt").write_text("contents")
+        assert staging.read("in.txt") == "contents"
+
+    def test_write(self, tmp_cwd):
+        staging.write("out.txt", "contents")
+        assert (tmp_cwd / "out.txt").read_text() == "contents"
+
+
+class TestStaged:
+    def test_reads_once(self, tmp_cwd, monkeypatch):
+        (tmp_cwd / "in.txt").write_text("contents")
+        with staging.staged() as stage:
+            staging.read("in.txt")
+            (tmp_cwd / "in.txt").write_text("changed")
+            assert staging.read("./in.txt") == "contents"
+            assert list(stage.buffers) == ["in.txt"]
+
+    def test_reads_staged_write(self, tmp_cwd):
+        with staging.staged():
+            staging.write("out.txt", "first")
+            assert staging.read("out.txt") == "first"
+
+    def test_defers_write(self, tmp_cwd):
+        with staging.staged():
+            staging.write("out.txt", "first")
+            assert not (tmp_cwd / "out.txt").exists()
+        assert (tmp_cwd / "out.txt").read_text() == "first"
+
+    def test_writes_last_version(self, tmp_cwd):
+        with staging.staged():
+            staging.write("out.txt", "first")
+            staging.write("out.txt", "second")
+        assert (tmp_cwd / "out.txt").read_text() == "second"
+
+    def test_makes_directories(self, tmp_cwd):
+        with staging.staged():
+            staging.write("a/b/out.txt", "contents")
+        assert (tmp_cwd / "a" / "b" / "out.txt").read_text() == "contents"
+
+    def test_keeps_mode(self, tmp_cwd):
+        script = tmp_cwd / "up.sh"
+        script.write_text("PROJECT")
+        script.chmod(0o755)
+        with staging.staged():
+            staging.write("up.sh", "myproject")
+        assert stat.S_IMODE(os.stat(script).st_mode) == 0o755
+
+    def test_no_temp_files(self, tmp_cwd):
+        with staging.staged():
+            staging.write("out.txt", "contents")
+        assert os.listdir(tmp_cwd) == ["out.txt"]
+
+    def test_discards_on_error(self, tmp_cwd):
+        (tmp_cwd / "in.txt").write_text("original")
+        with pytest.raises(RuntimeError):
+            with staging.staged():
+                staging.write("in.txt", "changed")
+                staging.write("out.txt", "contents")
+                raise RuntimeError
+        assert (tmp_cwd / "in.txt").read_text() == "original"
+        assert not (tmp_cwd / "out.txt").exists()
+
+    def test_deactivates(self, tmp_cwd):
+        with staging.staged():
+            pass
+        assert staging.active is None
+
+
+class TestTemplates:
+    @pytest.fixture
+    def templates(self, tmp_path):
+        (tmp_path / "make").mkdir()
+        (tmp_path / "make" / "test.sh").write_text("template")
+        return staging.Templates(tmp_path, paths=["make"])
+
+    def test_contains(self, templates):
+        assert os.path.join("make", "test.sh") in templates
+
+    def test_not_contains(self, templates):
+        assert "maker.sh" not in templates
+
+    def test_read_once(self, templates, tmp_path):
+        key = os.path.join("make", "test.sh")
+        templates.read(key)
+        (tmp_path / "make" / "test.sh").write_text("changed")
+        assert templates.read(key) == "template"
+
+    def test_staged_reads_template(self, templates, tmp_cwd):
+        with staging.staged(templates):
+            assert staging.read("./make/test.sh") == "template"
+
+    def test_staged_reads_other_files_from_disk(self, templates, tmp_cwd):
+        (tmp_cwd / "up.sh").write_text("PROJECT")
+        with staging.staged(templates):
+            assert staging.read("up.sh") == "PROJECT"
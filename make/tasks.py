@@ -0,0 +1,78 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tracing
+
+
+def normalize(paths):
+    return {os.path.normpath(path) for path in paths}
+
+
+def overlaps(paths: set, others: set):
+    for path in paths:
+        for other in others:
+            if path == other:
+                return True
+            if path.startswith(other + os.sep) or other.startswith(path + os.sep):
+                return True
+    return False
+
+
+class Task:
+    def __init__(self, name: str, func, *args, inputs=(), outputs=(), **kwargs):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.inputs = normalize(inputs)
+        self.outputs = normalize(outputs)
+        self.elapsed = None
+
+    def __repr__(self):
+        return f"Task({self.name!r})"
+
+    def depends_on(self, other):
+        return (
+            # reads or rewrites a file the other task writes
+            overlaps(other.outputs, self.inputs | self.outputs)
+            # or writes a file the other task reads
+            or overlaps(self.outputs, other.inputs)
+        )
+
+    def run(self, parent=None):
+        start = time.perf_counter()
+        try:
+            with tracing.span(self.name, parent=parent):
+                return self.func(*self.args, **self.kwargs)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+
+def dependencies(tasks: list):
+    return {
+        task: {earlier for earlier in tasks[:i] if task.depends_on(earlier)}
+        for i, task in enumerate(tasks)
+    }
+
+
+def run_tasks(tasks: list, max_workers=None):
+    graph = dependencies(tasks)
+    done = set()
+    running = {}
+    parent = tracing.current()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(done) < len(tasks):
+            for task in tasks:
+                waiting = task not in done and task not in running.values()
+                if waiting and graph[task] <= done:
+                    running[executor.submit(task.run, parent)] = task
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = running.pop(future)
+                future.result()
+                done.add(task)
+
+    return tasks
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+import tasks
+
+
+class TestDependsOn:
+    def test_independent(self):
+        first = tasks.Task("first", print, inputs=["a"], outputs=["b"])
+        second = tasks.Task("second", print, inputs=["c"], outputs=["d"])
+        assert not second.depends_on(first)
+
+    def test_reads_output(self):
+        first = tasks.Task("first", print, outputs=["./docker/.env.dev"])
+        second = tasks.Task("second", print, inputs=["docker/.env.dev"])
+        assert second.depends_on(first)
+
+    def test_writes_same_output(self):
+        first = tasks.Task("first", print, outputs=["README.md"])
+        second = tasks.Task("second", print, outputs=["README.md"])
+        assert second.depends_on(first)
+
+    def test_overwrites_input(self):
+        first = tasks.Task("first", print, inputs=["up.sh"])
+        second = tasks.Task("second", print, outputs=["up.sh"])
+        assert second.depends_on(first)
+
+    def test_writes_inside_directory(self):
+        first = tasks.Task("first", print, outputs=["src/users"])
+        second = tasks.Task("second", print, inputs=["src/users/views.py"])
+        assert second.depends_on(first)
+
+    def test_sibling_prefix(self):
+        first = tasks.Task("first", print, outputs=["src/users"])
+        second = tasks.Task("second", print, inputs=["src/users_test.py"])
+        assert not second.depends_on(first)
+
+
+class TestRunTasks:
+    def test_runs_all(self):
+        ran = []
+        steps = [tasks.Task(name, ran.append, name) for name in "abc"]
+        tasks.run_tasks(steps)
+        assert sorted(ran) == ["a", "b", "c"]
+
+    def test_respects_dependencies(self):
+        ran = []
+        steps = [
+            tasks.Task("write", ran.append, "write", outputs=["file"]),
+            tasks.Task("rewrite", ran.append, "rewrite", inputs=["file"]),
+        ]
+        tasks.run_tasks(steps)
+        assert ran == ["write", "rewrite"]
+
+    def test_runs_independent_tasks_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        steps = [
+            tasks.Task("first", barrier.wait, outputs=["a"]),
+            tasks.Task("second", barrier.wait, outputs=["b"]),
+        ]
+        tasks.run_tasks(steps, max_workers=2)
+
+    def test_records_elapsed(self):
+        steps = tasks.run_tasks([tasks.Task("task", lambda: None)])
+        assert steps[0].elapsed >= 0
+
+    def test_passes_arguments(self):
+        received = {}
+
+        def task(first, second=None):
+            received.update(first=first, second=second)
+
+        tasks.run_tasks([tasks.Task("task", task, 1, second=2, outputs=["a"])])
+        assert received == {"first": 1, "second": 2}
+
+    def test_raises(self):
+        def fail():
+            raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            tasks.run_tasks([tasks.Task("fail", fail)])
@@ -0,0 +1,191 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+IO_COUNTERS = "/proc/thread-self/io"
+
+enabled = False
+spans = []
+origin = time.perf_counter()
+lock = threading.Lock()
+local = threading.local()
+hooked = False
+ROLLED_UP = ["cpu", "bytes_read", "bytes_written", "opens"]
+
+
+class Span:
+    def __init__(self, name: str, category: str, parent=None):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.rolled = dict.fromkeys(ROLLED_UP, 0)
+        self.thread = threading.get_ident()
+        self.opens = 0
+        self.bytes_read = None
+        self.bytes_written = None
+        self.overhead = io_overhead()
+        self.io = io_counters()
+        self.cpu = time.thread_time()
+        self.start = time.perf_counter()
+        self.wall = None
+
+    def finish(self):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = time.thread_time() - self.cpu
+        overhead = io_overhead() - self.overhead
+        io = io_counters()
+        if self.io is not None and io is not None:
+            self.bytes_read = io[0] - self.io[0] - overhead
+            self.bytes_written = io[1] - self.io[1]
+
+        # Counters are per thread. Spans from other threads (task workers) add
+        # their totals here, and a same-thread parent only needs what they
+        # added, since its own counters already cover this span.
+        with lock:
+            rolled = dict(self.rolled)
+        for key, value in rolled.items():
+            if getattr(self, key) is not None:
+                setattr(self, key, getattr(self, key) + value)
+        if self.parent is not None:
+            if self.parent.thread != self.thread:
+                rolled = {key: getattr(self, key) for key in ROLLED_UP}
+            self.parent.roll_up(rolled)
+
+    def roll_up(self, values: dict):
+        with lock:
+            for key, value in values.items():
+                if value is not None:
+                    self.rolled[key] += value
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "category": self.category,
+            "thread": self.thread,
+            "start_ms": (self.start - origin) * 1000,
+            "wall_ms": self.wall * 1000,
+            "cpu_ms": self.cpu * 1000,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "opens": self.opens,
+        }
+
+
+def io_overhead():
+    return getattr(local, "overhead", 0)
+
+
+def io_counters():
+    local.quiet = True
+    try:
+        with open(IO_COUNTERS, "rb") as file:
+            contents = file.read()
+    except OSError:
+        return None
+    finally:
+        local.quiet = False
+
+    local.overhead = io_overhead() + len(contents)
+    counters = dict(line.split(b": ") for line in contents.splitlines())
+    return int(counters[b"rchar"]), int(counters[b"wchar"])
+
+
+def count_opens(event: str, args):
+    if event == "open" and enabled and not getattr(local, "quiet", False):
+        for current in getattr(local, "stack", ()):
+            current.opens += 1
+
+
+def enable():
+    global enabled, hooked, origin
+    if not hooked:
+        sys.addaudithook(count_opens)
+        hooked = True
+    origin = time.perf_counter()
+    spans.clear()
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def current():
+    stack = getattr(local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name: str, category: str = "step", parent: Span = None):
+    if not enabled:
+        yield None
+        return
+
+    stack = local.__dict__.setdefault("stack", [])
+    current = Span(name, category, parent or (stack[-1] if stack else None))
+    stack.append(current)
+    try:
+        yield current
+    finally:
+        stack.pop()
+        current.finish()
+        with lock:
+            spans.append(current)
+
+
+def traced(name: str = None, category: str = "step"):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def as_json():
+    return {"spans": [item.as_dict() for item in sorted(spans, key=by_start)]}
+
+
+def as_chrome_trace():
+    pid = os.getpid()
+    events = []
+    for item in sorted(spans, key=by_start):
+        record = item.as_dict()
+        events.append(
+            {
+                "name": item.name,
+                "cat": item.category,
+                "ph": "X",
+                "ts": record["start_ms"] * 1000,
+                "dur": record["wall_ms"] * 1000,
+                "pid": pid,
+                "tid": item.thread,
+                "args": {
+                    key: record[key]
+                    for key in ["cpu_ms", "bytes_read", "bytes_written", "opens"]
+                },
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def by_start(item: Span):
+    return item.start
+
+
+def dump(path: str, chrome_path: str = None):
+    with open(path, "w") as file:
+        json.dump(as_json(), file, indent=2)
+        file.write("\n")
+
+    if chrome_path:
+        with open(chrome_path, "w") as file:
+            json.dump(as_chrome_trace(), file)
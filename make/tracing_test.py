@@ -0,0 +1,145 @@
+import json
+import os
+
+import pytest
+import tasks
+import tracing
+
+
+@pytest.fixture
+def enabled():
+    tracing.enable()
+    yield tracing.spans
+    tracing.disable()
+    tracing.spans.clear()
+
+
+def test_disabled():
+    with tracing.span("step") as span:
+        pass
+    assert span is None
+    assert tracing.spans == []
+
+
+class TestSpan:
+    def test_records(self, enabled):
+        with tracing.span("step", "io"):
+            pass
+        assert [(span.name, span.category) for span in enabled] == [("step", "io")]
+
+    def test_times(self, enabled):
+        with tracing.span("step") as span:
+            sum(range(10000))
+        assert span.wall > 0
+        assert span.cpu >= 0
+
+    def test_counts_opens(self, enabled, tmp_path):
+        path = tmp_path / "file.txt"
+        path.write_text("contents")
+        with tracing.span("step") as span:
+            for _ in range(3):
+                with open(path):
+                    pass
+        assert span.opens == 3
+
+    def test_counts_nested_opens(self, enabled, tmp_path):
+        path = tmp_path / "file.txt"
+        with tracing.span("outer") as outer:
+            with tracing.span("inner") as inner:
+                with open(path, "w"):
+                    pass
+        assert (outer.opens, inner.opens) == (1, 1)
+
+    @pytest.mark.skipif(
+        not os.path.exists(tracing.IO_COUNTERS), reason="needs per-thread I/O"
+    )
+    def test_counts_bytes(self, enabled, tmp_path):
+        path = tmp_path / "file.txt"
+        with tracing.span("step") as span:
+            path.write_text("x" * 1000)
+            path.read_text()
+        assert span.bytes_written >= 1000
+        assert span.bytes_read >= 1000
+
+    def test_records_on_error(self, enabled):
+        with pytest.raises(RuntimeError):
+            with tracing.span("step"):
+                raise RuntimeError
+        assert len(enabled) == 1
+
+
+def test_traced(enabled):
+    @tracing.traced(category="io")
+    def step(value):
+        return value
+
+    assert step(1) == 1
+    assert [(span.name, span.category) for span in enabled] == [("step", "io")]
+
+
+def test_task_run(enabled):
+    tasks.run_tasks([tasks.Task("task", lambda: None)])
+    assert [span.name for span in enabled] == ["task"]
+
+
+class TestRollUp:
+    @pytest.fixture
+    def traced_tasks(self, enabled, tmp_path):
+        def write(name):
+            with tracing.span(f"write {name}"):
+                (tmp_path / name).write_text("x" * 1000)
+
+        steps = [tasks.Task(name, write, name, outputs=[name]) for name in "ab"]
+        with tracing.span("outer") as outer:
+            tasks.run_tasks(steps, max_workers=2)
+        return outer, {span.name: span for span in enabled}
+
+    def test_counts_task_opens(self, traced_tasks):
+        outer, spans = traced_tasks
+        assert spans["write a"].opens == spans["a"].opens == 1
+        assert outer.opens == 2
+
+    def test_counts_task_cpu(self, traced_tasks):
+        outer, spans = traced_tasks
+        assert outer.cpu >= spans["a"].cpu + spans["b"].cpu
+
+    @pytest.mark.skipif(
+        not os.path.exists(tracing.IO_COUNTERS), reason="needs per-thread I/O"
+    )
+    def test_counts_task_bytes(self, traced_tasks):
+        outer, spans = traced_tasks
+        assert spans["a"].bytes_written >= 1000
+        assert outer.bytes_written >= 2000
+
+
+class TestDump:
+    @pytest.fixture
+    def dumped(self, enabled, tmp_path):
+        with tracing.span("step"):
+            pass
+        trace, chrome = tmp_path / "trace.json", tmp_path / "chrome.json"
+        tracing.dump(str(trace), str(chrome))
+        return json.loads(trace.read_text()), json.loads(chrome.read_text())
+
+    def test_json(self, dumped):
+        trace, _ = dumped
+        span = trace["spans"][0]
+        assert span["name"] == "step"
+        expected = ["wall_ms", "cpu_ms", "bytes_read", "bytes_written", "opens"]
+        assert set(expected) <= set(span)
+
+    def test_chrome_trace(self, dumped):
+        _, chrome = dumped
+        event = chrome["traceEvents"][0]
+        assert (event["name"], event["ph"]) == ("step", "X")
+        assert event["dur"] >= 0
+
+
+@pytest.mark.skipif(
+    not os.path.exists(tracing.IO_COUNTERS), reason="needs per-thread I/O"
+)
+def test_excludes_own_reads(enabled):
+    with tracing.span("outer") as outer:
+        with tracing.span("inner"):
+            pass
+    assert outer.bytes_read == 0
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 from .forms import UserAccountChangeForm, UserAccountCreationForm
-from .models import UserAccount
+from .models import QueuedEmail, UserAccount
 
 
 class UserAccountAdmin(UserAdmin):
@@ -11,5 +11,16 @@ class UserAccountAdmin(UserAdmin):
     model = UserAccount
     list_display = ["username"]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).readable_by(request.user)
+
 
 admin.site.register(UserAccount, UserAccountAdmin)
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "created", "attempts", "sent", "failed"]
+    list_filter = ["failed"]
+
+
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
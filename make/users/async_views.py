@@ -0,0 +1,91 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import views
+from .models import UserAccount
+from .serializers import UserSerializer, represent, represent_many, values_for
+
+
+class AsyncAPIView(APIView):
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class UserDetailAPIView(AsyncAPIView, views.UserDetailAPIView):
+    async def aget_object(self, pk):
+        try:
+            return await UserAccount.objects.aget(pk=pk)
+        except UserAccount.DoesNotExist:
+            raise Http404
+
+    async def get(self, request, pk):
+        user = await self.aget_version(pk)
+
+        if await sync_to_async(user.can_read)(request.user):
+            return await self.acached_response(request, user)
+        elif not request.user.is_authenticated:
+            raise NotAuthenticated
+        else:
+            raise PermissionDenied
+
+    async def delete(self, request, pk):
+        user = await self.aget_object(pk)
+
+        if await sync_to_async(user.can_delete)(request.user):
+            user.is_active = False
+            await user.asave()
+            return Response(represent(UserSerializer, user))
+        elif not request.user.is_authenticated:
+            raise NotAuthenticated
+        else:
+            raise PermissionDenied
+
+
+class UserAPIView(AsyncAPIView, views.UserAPIView):
+    async def get(self, request, *args, **kwargs):
+        users = await sync_to_async(views.readable_users)(request.user)
+        users = views.filter_users(users, request.query_params, self.filter_fields)
+        paginator = views.UserCursorPagination()
+        rows = values_for(UserSerializer, users)
+        paginate = sync_to_async(paginator.paginate_queryset)
+        page = await paginate(rows, request, view=self)
+        return paginator.get_paginated_response(represent_many(UserSerializer, page))
+
+    async def post(self, request, *args, **kwargs):
+        view = views.prepare_view(views.UserRegisterAPIView(), self)
+        return await sync_to_async(view.post)(request, *args, **kwargs)
+
+
+class SessionAPIView(AsyncAPIView, views.SessionAPIView):
+    async def post(self, request, *args, **kwargs):
+        view = views.prepare_view(views.APILoginView(), self)
+        return await sync_to_async(view.post)(request, *args, **kwargs)
+
+    async def delete(self, request, *args, **kwargs):
+        view = views.prepare_view(views.APILogoutView(), self)
+        return await sync_to_async(view.post)(request, *args, **kwargs)
@@ -0,0 +1,143 @@
+import asyncio
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.urls import path
+from users import async_views, urls
+
+API_BASE = settings.API_BASE
+urlpatterns = [
+    path(f"{API_BASE}users/", async_views.UserAPIView.as_view()),
+    path(f"{API_BASE}users/<int:pk>/", async_views.UserDetailAPIView.as_view()),
+    path(f"{API_BASE}session/", async_views.SessionAPIView.as_view()),
+    *urls.urlpatterns,
+]
+
+pytestmark = pytest.mark.urls(__name__)
+
+
+@pytest.mark.parametrize(
+    "view",
+    [
+        async_views.UserAPIView,
+        async_views.UserDetailAPIView,
+        async_views.SessionAPIView,
+    ],
+)
+def test_views_are_async(view):
+    assert asyncio.iscoroutinefunction(view.as_view())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "get_client, expected",
+    [("other", 403), ("user", 200), ("staff", 200)],
+    indirect=["get_client"],
+)
+def test_user_detail(get_client, verified_user, expected):
+    cache.clear()
+    client, _ = get_client
+    response = client.get(f"/{API_BASE}users/{verified_user.id}/")
+    assert response.status_code == expected
+    if expected == 200:
+        assert response.data["id"] == verified_user.id
+        assert response.data["username"] == verified_user.username
+        assert "ETag" in response.headers
+
+
+@pytest.mark.django_db
+def test_user_detail_anonymous(anon_client, verified_user):
+    client, _ = anon_client
+    response = client.get(f"/{API_BASE}users/{verified_user.id}/")
+    assert response.data["detail"].code == "not_authenticated"
+
+
+@pytest.mark.django_db
+def test_user_detail_missing(staff_client):
+    client, _ = staff_client
+    response = client.get(f"/{API_BASE}users/999999/")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_user_detail_not_modified(user_client, verified_user):
+    cache.clear()
+    client, _ = user_client
+    endpoint = f"/{API_BASE}users/{verified_user.id}/"
+    etag = client.get(endpoint).headers["ETag"]
+    response = client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "get_client, expected",
+    [("other", 403), ("user", 200), ("staff", 200)],
+    indirect=["get_client"],
+)
+def test_user_delete(get_client, verified_user, expected):
+    client, _ = get_client
+    response = client.delete(f"/{API_BASE}users/{verified_user.id}/")
+    assert response.status_code == expected
+    verified_user.refresh_from_db()
+    assert verified_user.is_active is (expected != 200)
+
+
+@pytest.mark.django_db
+def test_user_list(staff_client, verified_user, verified_other):
+    client, _ = staff_client
+    response = client.get(f"/{API_BASE}users/?is_staff=false")
+    assert response.status_code == 200
+    usernames = sorted(user["username"] for user in response.data["results"])
+    assert usernames == ["other", "user"]
+
+
+@pytest.mark.django_db
+def test_user_list_invalid_filter(staff_client):
+    client, _ = staff_client
+    response = client.get(f"/{API_BASE}users/?is_staff=maybe")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_user_create(anon_client):
+    client, _ = anon_client
+    response = client.post(
+        f"/{API_BASE}users/",
+        {
+            "username": "testuser",
+            "email": "testuser@testing.com",
+            "password1": "testpass123",
+            "password2": "testpass123",
+        },
+    )
+    assert response.status_code == 201
+    assert response.data["username"] == "testuser"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "username, password, expected",
+    [("user", "nope", 400), ("user", "testpass123", 200)],
+)
+def test_session_post(anon_client, verified_user, username, password, expected):
+    client, _ = anon_client
+    response = client.post(
+        f"/{API_BASE}session/", {"username": username, "password": password}
+    )
+    assert response.status_code == expected
+
+
+@pytest.mark.django_db
+def test_session_delete(user_client):
+    client, _ = user_client
+    response = client.delete(f"/{API_BASE}session/")
+    assert response.status_code == 200
+
+
+def test_loadtest_rejects_url():
+    with pytest.raises(CommandError):
+        call_command("loadtest", "localhost:8000", stdout=StringIO())
@@ -0,0 +1,18 @@
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from .models import token_cache, token_cache_key
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        ttl = getattr(settings, "TOKEN_CACHE_TTL", 0)
+        if not ttl:
+            return super().authenticate_credentials(key)
+
+        cache_key = token_cache_key(key)
+        token = token_cache().get(cache_key)
+        if token is None:
+            _, token = super().authenticate_credentials(key)
+            token_cache().set(cache_key, token, ttl)
+        return token.user, token
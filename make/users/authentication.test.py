@@ -0,0 +1,126 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, update_last_login
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import token_cache, token_cache_key
+
+pytestmark = pytest.mark.django_db
+
+# The generated settings leave TOKEN_CACHE_TTL at 0 until CACHES points
+# TOKEN_CACHE_ALIAS at a backend every worker shares.
+cached = override_settings(TOKEN_CACHE_TTL=60)
+
+
+@pytest.fixture
+def token(verified_user):
+    token_cache().clear()
+    token, _ = Token.objects.get_or_create(user=verified_user)
+    return token
+
+
+@pytest.fixture
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def get_user(client, user):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/{settings.API_BASE}users/{user.id}/")
+    token_queries = [query for query in queries if "authtoken_token" in query["sql"]]
+    return response, token_queries
+
+
+@cached
+def test_token_lookup_is_cached(token_client, verified_user, token):
+    response, token_queries = get_user(token_client, verified_user)
+    assert response.status_code == 200
+    assert len(token_queries) == 1
+    assert token_cache().get(token_cache_key(token.key)) is not None
+
+    response, token_queries = get_user(token_client, verified_user)
+    assert response.status_code == 200
+    assert token_queries == []
+
+
+@cached
+def test_logout_invalidates_token(token_client, verified_user, token):
+    get_user(token_client, verified_user)
+    response = token_client.delete(f"/{settings.API_BASE}session/")
+    assert response.status_code == 200
+    assert token_cache().get(token_cache_key(token.key)) is None
+    response, _ = get_user(token_client, verified_user)
+    assert response.status_code == 401
+
+
+@cached
+def test_deactivation_invalidates_token(token_client, verified_user):
+    get_user(token_client, verified_user)
+    verified_user.is_active = False
+    verified_user.save()
+    response, _ = get_user(token_client, verified_user)
+    assert response.status_code == 401
+
+
+@cached
+def test_login_does_not_query_tokens(verified_user):
+    with CaptureQueriesContext(connection) as queries:
+        update_last_login(None, verified_user)
+    assert not any("authtoken_token" in query["sql"] for query in queries)
+
+
+@cached
+@pytest.mark.parametrize("field", ["is_staff", "is_superuser", "first_name"])
+def test_field_update_invalidates_token(token_client, verified_user, token, field):
+    get_user(token_client, verified_user)
+    value = getattr(verified_user, field)
+    setattr(verified_user, field, "changed" if isinstance(value, str) else not value)
+    verified_user.save(update_fields=[field])
+    assert token_cache().get(token_cache_key(token.key)) is None
+
+
+@cached
+@pytest.mark.parametrize("through_group", [False, True])
+def test_permission_change_invalidates_token(
+    token_client, verified_user, token, through_group
+):
+    permission = Permission.objects.get(codename="view_useraccount")
+    group = Group.objects.create(name="readers")
+    verified_user.groups.add(group)
+    get_user(token_client, verified_user)
+    if through_group:
+        group.permissions.add(permission)
+    else:
+        verified_user.user_permissions.add(permission)
+    assert token_cache().get(token_cache_key(token.key)) is None
+
+
+@cached
+def test_group_membership_invalidates_token(token_client, verified_user, token):
+    group = Group.objects.create(name="readers")
+    get_user(token_client, verified_user)
+    group.user_set.add(verified_user)
+    assert token_cache().get(token_cache_key(token.key)) is None
+
+
+@cached
+def test_invalid_token_is_not_cached(verified_user, token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token nope")
+    response, _ = get_user(client, verified_user)
+    assert response.status_code == 401
+    assert token_cache().get(token_cache_key("nope")) is None
+
+
+@override_settings(TOKEN_CACHE_TTL=0)
+def test_cache_disabled(token_client, verified_user, token):
+    get_user(token_client, verified_user)
+    response, token_queries = get_user(token_client, verified_user)
+    assert response.status_code == 200
+    assert len(token_queries) == 1
+    assert token_cache().get(token_cache_key(token.key)) is None
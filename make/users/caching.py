@@ -0,0 +1,88 @@
+import hashlib
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .serializers import represent, values_for
+
+
+@lru_cache(maxsize=None)
+def serializer_fingerprint(serializer_class):
+    fields = repr(serializer_class())
+    return hashlib.sha256(fields.encode()).hexdigest()[:16]
+
+
+class CachedDetailMixin:
+    model = None
+    serializer_class = None
+    version_field = "modified"
+    cache_timeout = 300
+
+    def get_version(self, pk):
+        try:
+            return self.model.objects.only("pk", self.version_field).get(pk=pk)
+        except self.model.DoesNotExist:
+            raise Http404
+
+    async def aget_version(self, pk):
+        try:
+            return await self.model.objects.only("pk", self.version_field).aget(pk=pk)
+        except self.model.DoesNotExist:
+            raise Http404
+
+    def get_etag(self, instance):
+        version = getattr(instance, self.version_field).timestamp()
+        fingerprint = serializer_fingerprint(self.serializer_class)
+        label = instance._meta.label_lower
+        return quote_etag(f"{label}:{instance.pk}:{version}:{fingerprint}")
+
+    def get_payload(self, instance, etag):
+        key = f"payload:{etag}"
+        data = cache.get(key)
+        if data is None:
+            queryset = self.model.objects.filter(pk=instance.pk)
+            obj = values_for(self.serializer_class, queryset).get()
+            data = dict(represent(self.serializer_class, obj))
+            cache.set(key, data, self.cache_timeout)
+        return data
+
+    async def aget_payload(self, instance, etag):
+        key = f"payload:{etag}"
+        data = await cache.aget(key)
+        if data is None:
+            queryset = self.model.objects.filter(pk=instance.pk)
+            obj = await values_for(self.serializer_class, queryset).aget()
+            data = dict(represent(self.serializer_class, obj))
+            await cache.aset(key, data, self.cache_timeout)
+        return data
+
+    def get_last_modified(self, instance):
+        return int(getattr(instance, self.version_field).timestamp())
+
+    def add_cache_headers(self, response, etag, last_modified):
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def cached_response(self, request, instance):
+        etag = self.get_etag(instance)
+        # Last-Modified has whole-second precision and can't tell apart two
+        # saves in the same second, so only the ETag answers conditionals.
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(self.get_payload(instance, etag))
+        last_modified = self.get_last_modified(instance)
+        return self.add_cache_headers(response, etag, last_modified)
+
+    async def acached_response(self, request, instance):
+        etag = self.get_etag(instance)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(await self.aget_payload(instance, etag))
+        last_modified = self.get_last_modified(instance)
+        return self.add_cache_headers(response, etag, last_modified)
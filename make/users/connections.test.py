@@ -0,0 +1,73 @@
+import runpy
+import sys
+
+import django.db
+import pytest
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db.utils import ConnectionHandler
+
+
+@pytest.fixture
+def production(monkeypatch):
+    def load(**environ):
+        monkeypatch.delenv("DJANGO_TESTING", raising=False)
+        for name in ["SQL_CONN_MAX_AGE", "SQL_CONN_HEALTH_CHECKS", "SQL_PGBOUNCER"]:
+            monkeypatch.delenv(name, raising=False)
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        path = sys.modules[settings.SETTINGS_MODULE].__file__
+        return runpy.run_path(path)["DATABASES"]["default"]
+
+    return load
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    def connect(**options):
+        engine = {"ENGINE": "django.db.backends.sqlite3"}
+        name = {"NAME": str(tmp_path / "db.sqlite3")}
+        handler = ConnectionHandler({"default": {**options, **engine, **name}})
+        monkeypatch.setattr(django.db, "connections", handler)
+        return handler["default"]
+
+    return connect
+
+
+def serve(connection):
+    request_started.send(sender=None)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    request_finished.send(sender=None)
+    return connection.connection
+
+
+def test_connection_defaults(production):
+    default = production()
+    assert default["CONN_MAX_AGE"] == (0 if settings.ASYNC_API_VIEWS else 60)
+    assert default["CONN_HEALTH_CHECKS"] is True
+    assert default["DISABLE_SERVER_SIDE_CURSORS"] is False
+
+
+def test_connection_environment(production):
+    default = production(SQL_CONN_MAX_AGE="300", SQL_CONN_HEALTH_CHECKS="0")
+    assert default["CONN_MAX_AGE"] == 300
+    assert default["CONN_HEALTH_CHECKS"] is False
+
+
+def test_pgbouncer(production):
+    default = production(SQL_HOST="pgbouncer", SQL_PORT="5432", SQL_PGBOUNCER="1")
+    assert default["HOST"] == "pgbouncer"
+    assert default["PORT"] == "5432"
+    assert default["DISABLE_SERVER_SIDE_CURSORS"] is True
+
+
+@pytest.mark.django_db
+def test_default_connection_lifetime(production, database):
+    connection = database(**production())
+    first = serve(connection)
+    if connection.settings_dict["CONN_MAX_AGE"]:
+        assert serve(connection) is first
+    else:
+        assert first is None
+    connection.close()
@@ -0,0 +1,124 @@
+import logging
+import multiprocessing
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+HASHING_SETTINGS = ["PASSWORD_HASHING_WORKERS", "PASSWORD_HASHING_QUEUE"]
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        tuned = getattr(settings, "PASSWORD_HASH_ITERATIONS", 0)
+        return max(tuned, PBKDF2PasswordHasher.iterations)
+
+
+class HashingService:
+    def __init__(self, workers: int = 0, queue_size: int = 32):
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(max(1, queue_size))
+        self.latencies = deque(maxlen=1000)
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=django.setup,
+                )
+        return self.executor
+
+    def submit(self, raw_password):
+        start = time.perf_counter()
+        if not self.workers or raw_password is None:
+            future = Future()
+            future.set_result(make_password(raw_password))
+            self.record(start)
+            return future
+
+        self.slots.acquire()
+        try:
+            future = self.get_executor().submit(make_password, raw_password)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.done(start))
+        return future
+
+    def done(self, start: float):
+        self.slots.release()
+        self.record(start)
+
+    def record(self, start: float):
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        logger.debug("Hashed a password in %.1f ms", latency * 1000)
+
+    def hash(self, raw_password):
+        return self.submit(raw_password).result()
+
+    def hash_many(self, raw_passwords):
+        futures = [self.submit(raw_password) for raw_password in raw_passwords]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {"count": 0}
+        ms = [latency * 1000 for latency in latencies]
+        return {
+            "count": len(ms),
+            "mean_ms": statistics.fmean(ms),
+            "p50_ms": ms[len(ms) // 2],
+            "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+            "max_ms": ms[-1],
+        }
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = HashingService(
+                getattr(settings, "PASSWORD_HASHING_WORKERS", 0),
+                getattr(settings, "PASSWORD_HASHING_QUEUE", 32),
+            )
+        return _service
+
+
+def hash_password(raw_password):
+    return get_service().hash(raw_password)
+
+
+@receiver(setting_changed)
+def reset_service(setting, **kwargs):
+    global _service
+    if setting in HASHING_SETTINGS:
+        with _service_lock:
+            if _service is not None:
+                _service.shutdown()
+            _service = None
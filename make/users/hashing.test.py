@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    identify_hasher,
+)
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from users import hashing
+from users.models import UserAccount
+
+DEFAULT_ITERATIONS = PBKDF2PasswordHasher.iterations
+TUNED = "users.hashing.TunedPBKDF2PasswordHasher"
+
+
+@override_settings(PASSWORD_HASHERS=[TUNED], PASSWORD_HASH_ITERATIONS=0)
+def test_tuned_hasher_defaults_to_django_iterations():
+    encoded = hashing.TunedPBKDF2PasswordHasher().encode("secret", "salt")
+    assert encoded.split("$")[1] == str(DEFAULT_ITERATIONS)
+
+
+@override_settings(PASSWORD_HASHERS=[TUNED])
+def test_tuned_hasher_upgrades_old_hashes():
+    old = PBKDF2PasswordHasher().encode("secret", "salt")
+    hasher = hashing.TunedPBKDF2PasswordHasher()
+    with override_settings(PASSWORD_HASH_ITERATIONS=DEFAULT_ITERATIONS + 10_000):
+        assert hasher.must_update(old) is True
+        encoded = hasher.encode("secret", "salt")
+    assert encoded.split("$")[1] == str(DEFAULT_ITERATIONS + 10_000)
+    assert check_password("secret", encoded)
+
+
+def test_tuned_hasher_owns_stored_hashes():
+    stored = PBKDF2PasswordHasher().encode("secret", "salt")
+    assert isinstance(identify_hasher(stored), hashing.TunedPBKDF2PasswordHasher)
+
+
+@pytest.mark.django_db
+def test_login_upgrades_stored_hash():
+    user = UserAccount.objects.create(username="legacy")
+    user.password = PBKDF2PasswordHasher().encode("secret", "salt")
+    user.save()
+    iterations = DEFAULT_ITERATIONS + 10_000
+    with override_settings(
+        PASSWORD_HASHERS=[TUNED], PASSWORD_HASH_ITERATIONS=iterations
+    ):
+        assert user.check_password("secret")
+    assert user.password.split("$")[1] == str(DEFAULT_ITERATIONS + 10_000)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1)
+def test_tuned_hasher_never_weakens():
+    assert hashing.TunedPBKDF2PasswordHasher().iterations == DEFAULT_ITERATIONS
+
+
+def test_inline_service_records_latency():
+    service = hashing.HashingService(workers=0)
+    encoded = service.hash("secret")
+    assert check_password("secret", encoded)
+    assert service.stats()["count"] == 1
+    assert service.stats()["max_ms"] >= service.stats()["p50_ms"] > 0
+
+
+def test_process_pool_service():
+    service = hashing.HashingService(workers=2, queue_size=1)
+    try:
+        hashes = service.hash_many(["one", "two", None])
+    finally:
+        service.shutdown()
+    assert check_password("one", hashes[0])
+    assert check_password("two", hashes[1])
+    assert hashes[2].startswith("!")
+    assert service.stats()["count"] == 3
+    assert service.executor is None
+
+
+def test_settings_change_resets_service():
+    with override_settings(PASSWORD_HASHING_WORKERS=0):
+        service = hashing.get_service()
+        assert hashing.get_service() is service
+    assert hashing.get_service() is not service
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+def test_set_password_uses_service():
+    user = UserAccount(username="hashed")
+    user.set_password("secret")
+    assert user.check_password("secret")
+    assert hashing.get_service().stats()["count"] == 1
+
+
+def test_calibrate_hasher():
+    stdout = StringIO()
+    call_command("calibrate_hasher", "--target-ms", "1", "--rounds", "1", stdout=stdout)
+    suggestion = stdout.getvalue().splitlines()[-1]
+    assert suggestion == f"PASSWORD_HASH_ITERATIONS={DEFAULT_ITERATIONS}"
+
+
+@pytest.mark.parametrize("option", ["--target-ms=0", "--rounds=0"])
+def test_calibrate_hasher_rejects_options(option):
+    with pytest.raises(CommandError, match="must be positive"):
+        call_command("calibrate_hasher", option, stdout=StringIO())
@@ -0,0 +1,109 @@
+import json
+from io import StringIO
+
+import pytest
+from allauth.account.models import EmailAddress
+from django.core import mail
+from django.core.management import CommandError, call_command
+from users.models import UserAccount
+
+pytestmark = pytest.mark.django_db
+
+
+def import_users(path, *args):
+    stdout, stderr = StringIO(), StringIO()
+    call_command("import_users", str(path), *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def test_export_csv(tmp_path, verified_user, other):
+    path = tmp_path / "users.csv"
+    call_command("export_users", str(path), stdout=StringIO())
+    lines = path.read_text().splitlines()
+    assert lines[0].split(",") == [
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "is_active",
+        "is_staff",
+        "date_joined",
+        "email_verified",
+    ]
+    assert lines[1].startswith("user,user@testing.com,")
+    assert lines[1].endswith(",True")
+    assert lines[2].endswith(",False")
+
+
+def test_export_jsonl_to_stdout(verified_user):
+    stdout = StringIO()
+    call_command(
+        "export_users", "--format", "jsonl", "--chunk-size", "1", stdout=stdout
+    )
+    row = json.loads(stdout.getvalue())
+    assert row["username"] == "user"
+    assert row["email_verified"] is True
+    assert "password" not in row
+
+
+def test_export_import_roundtrip(tmp_path, verified_user):
+    path = tmp_path / "users.jsonl"
+    call_command("export_users", str(path), "--with-passwords", stdout=StringIO())
+    password = verified_user.password
+    UserAccount.objects.all().delete()
+
+    stdout, _ = import_users(path)
+    assert stdout.strip() == "Imported 1 users, skipped 0."
+    user = UserAccount.objects.get(username="user")
+    assert user.password == password
+    assert EmailAddress.objects.get(user=user).verified is True
+
+
+def test_import_csv_raw_passwords(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,email,raw_password,is_staff\n"
+        "alice,alice@testing.com,secret123,1\n"
+        "bob,bob@testing.com,,\n"
+    )
+    import_users(path, "--workers", "1", "--verified", "--batch-size", "1")
+    alice = UserAccount.objects.get(username="alice")
+    assert alice.check_password("secret123")
+    assert alice.is_staff is True
+    assert UserAccount.objects.get(username="bob").has_usable_password() is False
+    addresses = EmailAddress.objects.filter(verified=True, primary=True)
+    assert addresses.count() == 2
+    assert len(mail.outbox) == 0
+
+
+def test_import_hashes_in_process_pool(tmp_path):
+    path = tmp_path / "users.jsonl"
+    rows = [{"username": f"pooled{i}", "raw_password": f"secret{i}"} for i in range(3)]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    import_users(path, "--workers", "2")
+    users = UserAccount.objects.filter(username__startswith="pooled")
+    assert users.count() == 3
+    assert all(user.check_password(f"secret{user.username[-1]}") for user in users)
+
+
+def test_import_skips_bad_rows(tmp_path, user):
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        '{"username": "user"}\n'
+        '{"username": "carol", "email": "carol@testing.com"}\n'
+        '{"username": "carol2", "email": "carol@testing.com"}\n'
+        '{"username": ""}\n'
+        "not json\n"
+        '{"username": "dave", "password": "plaintext"}\n'
+        '{"username": "erin", "date_joined": "yesterday"}\n'
+    )
+    stdout, stderr = import_users(path, "--workers", "1")
+    assert stdout.strip() == "Imported 1 users, skipped 6."
+    assert "Row 1: username 'user' already exists" in stderr
+    assert "Row 3: email 'carol@testing.com' already exists" in stderr
+    assert UserAccount.objects.filter(username="carol").exists()
+
+
+def test_import_missing_file(tmp_path):
+    with pytest.raises(CommandError):
+        import_users(tmp_path / "missing.csv")
@@ -0,0 +1,119 @@
+import base64
+from datetime import timedelta
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+MESSAGE_FIELDS = ["subject", "body", "from_email", "to", "cc", "bcc", "reply_to"]
+
+
+def serialize(message):
+    data = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+    data["headers"] = message.extra_headers
+    data["content_subtype"] = message.content_subtype
+    data["alternatives"] = list(map(list, getattr(message, "alternatives", [])))
+    data["attachments"] = []
+    for attachment in message.attachments:
+        if isinstance(attachment, MIMEBase):
+            raise TypeError("MIME attachments cannot be queued.")
+        filename, content, mimetype = attachment
+        is_binary = isinstance(content, bytes)
+        if is_binary:
+            content = base64.b64encode(content).decode("ascii")
+        data["attachments"].append([filename, content, mimetype, is_binary])
+    return data
+
+
+def deserialize(data):
+    fields = {field: data[field] for field in MESSAGE_FIELDS}
+    message = EmailMultiAlternatives(
+        headers=data["headers"], alternatives=data["alternatives"], **fields
+    )
+    message.content_subtype = data["content_subtype"]
+    for filename, content, mimetype, is_binary in data["attachments"]:
+        if is_binary:
+            content = base64.b64decode(content)
+        message.attach(filename, content, mimetype)
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        queued = [
+            QueuedEmail(message=serialize(message))
+            for message in email_messages
+            if message.recipients()
+        ]
+        try:
+            QueuedEmail.objects.bulk_create(queued)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(queued)
+
+
+def retry_delay(attempts: int):
+    base = getattr(settings, "EMAIL_QUEUE_RETRY_DELAY", 60)
+    ceiling = getattr(settings, "EMAIL_QUEUE_MAX_RETRY_DELAY", 3600)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), ceiling))
+
+
+def claim(batch_size: int):
+    lease = timedelta(seconds=getattr(settings, "EMAIL_QUEUE_LEASE", 300))
+    now = timezone.now()
+    with transaction.atomic():
+        due = QueuedEmail.objects.filter(
+            sent__isnull=True, failed=False, next_attempt__lte=now
+        )
+        due = due.order_by("next_attempt", "id").select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        ids = [queued.id for queued in batch]
+        QueuedEmail.objects.filter(id__in=ids).update(next_attempt=now + lease)
+    return batch
+
+
+def record_failure(queued, error):
+    max_attempts = getattr(settings, "EMAIL_QUEUE_MAX_ATTEMPTS", 5)
+    queued.attempts += 1
+    queued.error = repr(error)
+    queued.failed = queued.attempts >= max_attempts
+    queued.next_attempt = timezone.now() + retry_delay(queued.attempts)
+
+
+def deliver(batch_size: int = 100):
+    batch = claim(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    sent = 0
+    try:
+        connection.open()
+    except Exception as error:
+        for queued in batch:
+            record_failure(queued, error)
+    else:
+        try:
+            for queued in batch:
+                try:
+                    connection.send_messages([deserialize(queued.message)])
+                except Exception as error:
+                    record_failure(queued, error)
+                else:
+                    queued.attempts += 1
+                    queued.sent = timezone.now()
+                    queued.error = ""
+                    sent += 1
+        finally:
+            connection.close()
+
+    fields = ["attempts", "next_attempt", "sent", "failed", "error"]
+    QueuedEmail.objects.bulk_update(batch, fields)
+    return sent, len(batch) - sent
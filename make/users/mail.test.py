@@ -0,0 +1,190 @@
+import socket
+from datetime import timedelta
+from email import message_from_bytes
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from users.mail import deliver, deserialize, serialize
+from users.models import QueuedEmail
+
+QUEUED = "users.mail.QueuedEmailBackend"
+LOCMEM = "django.core.mail.backends.locmem.EmailBackend"
+SMTP = "django.core.mail.backends.smtp.EmailBackend"
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("queued_mail"),
+]
+
+
+@pytest.fixture
+def queued_mail():
+    with override_settings(EMAIL_BACKEND=QUEUED, EMAIL_DELIVERY_BACKEND=LOCMEM):
+        yield
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("refused")
+
+
+def send(count=1):
+    for i in range(count):
+        mail.send_mail(f"Hello {i}", "Body", "from@testing.com", ["to@testing.com"])
+
+
+def test_backend_queues_instead_of_sending():
+    send(2)
+    assert len(mail.outbox) == 0
+    assert QueuedEmail.objects.filter(sent__isnull=True).count() == 2
+
+
+def test_rolled_back_email_is_not_queued():
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            send()
+            raise RuntimeError
+    assert not QueuedEmail.objects.exists()
+
+
+def test_serialize_roundtrip():
+    message = mail.EmailMultiAlternatives(
+        "Subject",
+        "Body",
+        "from@testing.com",
+        ["to@testing.com"],
+        bcc=["bcc@testing.com"],
+        reply_to=["reply@testing.com"],
+        headers={"X-Test": "1"},
+    )
+    message.attach_alternative("<p>Body</p>", "text/html")
+    message.attach("notes.txt", "text", "text/plain")
+    message.attach("data.bin", b"\x00\xff", "application/octet-stream")
+    copy = deserialize(serialize(message))
+    assert copy.recipients() == message.recipients()
+    assert copy.reply_to == message.reply_to
+    assert copy.extra_headers == {"X-Test": "1"}
+    assert list(map(tuple, copy.alternatives)) == [("<p>Body</p>", "text/html")]
+    assert [attachment[1] for attachment in copy.attachments] == ["text", b"\x00\xff"]
+
+
+def test_deliver_sends_in_batches():
+    send(3)
+    assert deliver(batch_size=2) == (2, 0)
+    assert len(mail.outbox) == 2
+    assert deliver(batch_size=2) == (1, 0)
+    assert deliver(batch_size=2) == (0, 0)
+    assert [message.subject for message in mail.outbox] == [
+        "Hello 0",
+        "Hello 1",
+        "Hello 2",
+    ]
+    assert not QueuedEmail.objects.filter(sent__isnull=True).exists()
+
+
+@override_settings(
+    EMAIL_DELIVERY_BACKEND=f"{__name__}.FailingBackend",
+    EMAIL_QUEUE_MAX_ATTEMPTS=2,
+    EMAIL_QUEUE_RETRY_DELAY=60,
+)
+def test_deliver_retries_with_backoff():
+    send()
+    start = timezone.now()
+    assert deliver() == (0, 1)
+    queued = QueuedEmail.objects.get()
+    assert queued.attempts == 1
+    assert queued.failed is False
+    assert "refused" in queued.error
+    assert queued.next_attempt >= start + timedelta(seconds=60)
+
+    assert deliver() == (0, 0)
+    QueuedEmail.objects.update(next_attempt=timezone.now())
+    assert deliver() == (0, 1)
+    queued.refresh_from_db()
+    assert queued.attempts == 2
+    assert queued.failed is True
+
+
+def test_retry_succeeds():
+    send()
+    with override_settings(EMAIL_DELIVERY_BACKEND=f"{__name__}.FailingBackend"):
+        deliver()
+    QueuedEmail.objects.update(next_attempt=timezone.now())
+    assert deliver() == (1, 0)
+    queued = QueuedEmail.objects.get()
+    assert queued.attempts == 2
+    assert queued.error == ""
+
+
+def test_registration_email_is_queued(anon_client):
+    cache.clear()
+    client, _ = anon_client
+    response = client.post(
+        f"/{settings.API_BASE}users/",
+        {
+            "username": "testuser",
+            "email": "testuser@testing.com",
+            "password1": "testpass123",
+            "password2": "testpass123",
+        },
+    )
+    assert response.status_code == 201
+    assert len(mail.outbox) == 0
+    call_command("send_queued_mail", "--once", stdout=StringIO())
+    assert mail.outbox[0].to == ["testuser@testing.com"]
+
+
+@pytest.fixture
+def smtp_server():
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.messages = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope)
+            return "250 Message accepted for delivery"
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = Handler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+def test_deliver_over_smtp(smtp_server):
+    handler, port = smtp_server
+    send(2)
+    smtp = {"EMAIL_HOST": "127.0.0.1", "EMAIL_PORT": port, "EMAIL_USE_TLS": False}
+    with override_settings(EMAIL_DELIVERY_BACKEND=SMTP, **smtp):
+        assert deliver() == (2, 0)
+    assert [envelope.rcpt_tos for envelope in handler.messages] == [
+        ["to@testing.com"],
+        ["to@testing.com"],
+    ]
+    message = message_from_bytes(handler.messages[0].content)
+    assert message["Subject"] == "Hello 0"
+
+
+def test_smtp_outage_is_retried(smtp_server):
+    handler, port = smtp_server
+    send()
+    smtp = {"EMAIL_DELIVERY_BACKEND": SMTP, "EMAIL_HOST": "127.0.0.1"}
+    with override_settings(EMAIL_PORT=port + 1, **smtp):
+        assert deliver() == (0, 1)
+    QueuedEmail.objects.update(next_attempt=timezone.now())
+    with override_settings(EMAIL_PORT=port, **smtp):
+        assert deliver() == (1, 0)
+    assert len(handler.messages) == 1
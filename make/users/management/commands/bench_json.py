@@ -0,0 +1,82 @@
+import io
+from timeit import repeat
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ...models import UserAccount
+from ...renderers import ORJSONParser, ORJSONRenderer, orjson
+from ...serializers import UserSerializer, represent_many
+from ...views import UserAPIView
+
+
+class Command(BaseCommand):
+    help = "Measure JSON rendering and parsing throughput for the users endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--number", type=int, default=50)
+        parser.add_argument(
+            "--endpoint",
+            action="store_true",
+            help="also time GET requests to the user list through the view, using "
+            "the users in the database",
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed; both paths use json.")
+
+        users = [
+            UserAccount(id=i, username=f"user{i}", is_active=True, is_staff=False)
+            for i in range(1, options["users"] + 1)
+        ]
+        results = represent_many(UserSerializer, users)
+        payloads = {
+            "detail": results[0],
+            "list": {"next": None, "previous": None, "results": results},
+        }
+        pairs = {
+            "json": (JSONRenderer(), JSONParser()),
+            "orjson": (ORJSONRenderer(), ORJSONParser()),
+        }
+
+        number = options["number"]
+        for name, payload in payloads.items():
+            for label, (renderer, parser) in pairs.items():
+                body = renderer.render(payload)
+                render = self.time(lambda: renderer.render(payload), number)
+                parse = self.time(lambda: parser.parse(io.BytesIO(body)), number)
+                self.report(f"{name} {label}", len(body), render, parse)
+
+        if options["endpoint"]:
+            self.time_endpoint(number)
+
+    def time(self, func, number: int):
+        return min(repeat(func, number=number, repeat=5)) / number
+
+    def report(self, name: str, size: int, render: float, parse: float):
+        self.stdout.write(
+            f"{name:<16} {size:>8} B  render {1 / render:>10.0f}/s "
+            f"{size / render / 1e6:>8.1f} MB/s  parse {1 / parse:>10.0f}/s"
+        )
+
+    def time_endpoint(self, number: int):
+        staff = UserAccount.objects.filter(is_staff=True).first()
+        if staff is None:
+            raise CommandError("--endpoint needs a staff user in the database.")
+
+        factory = APIRequestFactory()
+        for renderer in [JSONRenderer, ORJSONRenderer]:
+            view = UserAPIView.as_view(renderer_classes=[renderer])
+
+            def get():
+                request = factory.get("/", {"page_size": 200})
+                force_authenticate(request, user=staff)
+                return view(request).render()
+
+            elapsed = self.time(get, number)
+            name = f"GET list {renderer.__name__}"
+            self.stdout.write(f"{name:<32} {1 / elapsed:>10.0f} requests/s")
@@ -0,0 +1,46 @@
+from timeit import repeat
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from ...models import UserAccount
+from ...serializers import UserSerializer, compile_representation, represent_many
+
+
+class Command(BaseCommand):
+    help = "Time the compiled UserSerializer fast path against DRF serialization."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--number", type=int, default=20)
+
+    def handle(self, *args, **options):
+        users = [
+            UserAccount(
+                id=i, username=f"user{i}", is_active=i % 2 == 0, is_staff=i % 10 == 0
+            )
+            for i in range(1, options["users"] + 1)
+        ]
+        sources = compile_representation(UserSerializer).sources
+        rows = [{source: getattr(user, source) for source in sources} for user in users]
+
+        renderer = JSONRenderer()
+        paths = {
+            "drf": lambda: UserSerializer(users, many=True).data,
+            "fast (instances)": lambda: represent_many(UserSerializer, users),
+            "fast (rows)": lambda: represent_many(UserSerializer, rows),
+        }
+
+        expected = renderer.render(paths["drf"]())
+        for name, path in paths.items():
+            if renderer.render(path()) != expected:
+                raise CommandError(f"{name} output differs from DRF")
+
+        number = options["number"]
+        baseline = None
+        for name, path in paths.items():
+            elapsed = min(repeat(path, number=number, repeat=5)) / number
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"{name:<18} {elapsed * 1000:9.3f} ms  {baseline / elapsed:6.1f}x"
+            )
@@ -0,0 +1,53 @@
+import statistics
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.crypto import get_random_string
+
+SAMPLE_ITERATIONS = 100_000
+
+
+def time_pbkdf2(iterations: int, rounds: int):
+    hasher = PBKDF2PasswordHasher()
+    timings = []
+    for _ in range(rounds):
+        salt = hasher.salt()
+        start = time.perf_counter()
+        hasher.encode(get_random_string(16), salt, iterations)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, rounds: int = 5):
+    per_iteration = time_pbkdf2(SAMPLE_ITERATIONS, rounds) / SAMPLE_ITERATIONS
+    iterations = int(target_ms / 1000 / per_iteration) // 10_000 * 10_000
+    return max(iterations, PBKDF2PasswordHasher.iterations), per_iteration
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark PBKDF2 on this machine and print the PASSWORD_HASH_ITERATIONS "
+        "that makes one password hash cost about --target-ms of CPU. The result "
+        "never drops below Django's default iteration count."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=250)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options["target_ms"] <= 0 or options["rounds"] < 1:
+            raise CommandError("--target-ms and --rounds must be positive.")
+
+        iterations, per_iteration = calibrate(options["target_ms"], options["rounds"])
+        default = PBKDF2PasswordHasher.iterations
+        lines = [
+            f"default      {default} iterations, "
+            f"{default * per_iteration * 1000:.1f} ms",
+            f"calibrated   {iterations} iterations, "
+            f"{iterations * per_iteration * 1000:.1f} ms",
+            f"PASSWORD_HASH_ITERATIONS={iterations}",
+        ]
+        self.stdout.write("\n".join(lines))
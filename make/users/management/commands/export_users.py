@@ -0,0 +1,75 @@
+import csv
+import json
+
+from allauth.account.models import EmailAddress
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef
+
+from ...models import UserAccount
+
+FIELDS = [
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "date_joined",
+    "email_verified",
+]
+FORMATS = ["csv", "jsonl"]
+
+
+def file_format(path: str, requested=None):
+    if requested:
+        return requested
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream user accounts to CSV or JSON Lines, reading the users table in "
+        "chunks. Use '-' to write to standard output."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--with-passwords",
+            action="store_true",
+            help="include password hashes so accounts can be imported elsewhere",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        kind = file_format(path, options["format"])
+        fields = FIELDS + (["password"] if options["with_passwords"] else [])
+        verified = EmailAddress.objects.filter(
+            user=OuterRef("pk"), email=OuterRef("email"), verified=True
+        )
+        users = UserAccount.objects.annotate(email_verified=Exists(verified))
+        rows = users.order_by("pk").values(*fields)
+        rows = rows.iterator(chunk_size=options["chunk_size"])
+
+        if path == "-":
+            self.write(self.stdout, rows, fields, kind)
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as output:
+                count = self.write(output, rows, fields, kind)
+            self.stdout.write(f"Exported {count} users to {path}.")
+
+    def write(self, output, rows, fields, kind: str):
+        count = 0
+        if kind == "csv":
+            writer = csv.DictWriter(output, fieldnames=fields, lineterminator="\n")
+            writer.writeheader()
+            for count, row in enumerate(rows, 1):
+                row["date_joined"] = row["date_joined"].isoformat()
+                writer.writerow(row)
+        else:
+            for count, row in enumerate(rows, 1):
+                output.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+        return count
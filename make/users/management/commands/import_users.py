@@ -0,0 +1,173 @@
+import csv
+import json
+import os
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import identify_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from ...hashing import HashingService
+from ...models import UserAccount
+from .export_users import FORMATS, file_format
+
+TRUE_VALUES = ["1", "true", "t", "yes", "y"]
+
+
+def read_rows(stream, kind: str):
+    if kind == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def to_bool(value, default: bool):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def build_user(row: dict):
+    if not isinstance(row, dict):
+        raise ValueError("expected an object")
+    username = (row.get("username") or "").strip()
+    if not username:
+        raise ValueError("username is required")
+    user = UserAccount(
+        username=username,
+        email=UserAccount.objects.normalize_email(row.get("email") or ""),
+        first_name=row.get("first_name") or "",
+        last_name=row.get("last_name") or "",
+        is_active=to_bool(row.get("is_active"), True),
+        is_staff=to_bool(row.get("is_staff"), False),
+    )
+    if row.get("date_joined"):
+        user.date_joined = parse_datetime(row["date_joined"])
+        if user.date_joined is None:
+            raise ValueError(f"invalid date_joined {row['date_joined']!r}")
+    if row.get("password"):
+        identify_hasher(row["password"])
+        user.password = row["password"]
+    return user
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream user accounts from CSV or JSON Lines into the database in "
+        "batches. Rows may carry a Django password hash in 'password' or a "
+        "plain-text 'raw_password', which is hashed in a process pool. No "
+        "verification email is sent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="file to read, or '-' for standard input")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="processes used to hash raw passwords (1 hashes in-process)",
+        )
+        parser.add_argument(
+            "--verified",
+            action="store_true",
+            help="mark email addresses verified unless a row says otherwise",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        kind = file_format(path, options["format"])
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if path == "-":
+            stream = nullcontext(sys.stdin)
+        else:
+            try:
+                stream = open(path, newline="", encoding="utf-8")
+            except OSError as error:
+                raise CommandError(error)
+
+        workers = options["workers"] if options["workers"] > 1 else 0
+        self.hashing = HashingService(workers, queue_size=4 * max(1, workers))
+        self.created = self.skipped = 0
+        try:
+            with stream as rows:
+                numbered = enumerate(read_rows(rows, kind), 1)
+                while batch := list(islice(numbered, options["batch_size"])):
+                    self.import_batch(batch, options["verified"])
+        finally:
+            self.hashing.shutdown()
+
+        self.stdout.write(f"Imported {self.created} users, skipped {self.skipped}.")
+        stats = self.hashing.stats()
+        if stats["count"]:
+            self.stdout.write(
+                f"Hashed {stats['count']} passwords: mean {stats['mean_ms']:.1f} ms, "
+                f"p95 {stats['p95_ms']:.1f} ms"
+            )
+
+    def import_batch(self, batch, verified: bool):
+        rows = []
+        for line, row in batch:
+            try:
+                if isinstance(row, str):
+                    row = json.loads(row)
+                rows.append((line, row, build_user(row)))
+            except ValueError as error:
+                self.skip(line, error)
+
+        usernames = [user.username for _, _, user in rows]
+        emails = [user.email for _, _, user in rows if user.email]
+        existing = UserAccount.objects.filter(username__in=usernames)
+        existing_usernames = set(existing.values_list("username", flat=True))
+        existing = UserAccount.objects.filter(email__in=emails)
+        existing_emails = set(existing.values_list("email", flat=True))
+
+        accepted = []
+        for line, row, user in rows:
+            if user.username in existing_usernames:
+                self.skip(line, f"username {user.username!r} already exists")
+            elif user.email in existing_emails:
+                self.skip(line, f"email {user.email!r} already exists")
+            else:
+                existing_usernames.add(user.username)
+                if user.email:
+                    existing_emails.add(user.email)
+                accepted.append((row, user))
+
+        hashed = [(row, user) for row, user in accepted if row.get("raw_password")]
+        passwords = self.hashing.hash_many([row["raw_password"] for row, _ in hashed])
+        for (_, user), password in zip(hashed, passwords):
+            user.password = password
+        for _, user in accepted:
+            if not user.password:
+                user.set_unusable_password()
+
+        addresses = [
+            EmailAddress(
+                user=user,
+                email=user.email,
+                primary=True,
+                verified=to_bool(row.get("email_verified"), verified),
+            )
+            for row, user in accepted
+            if user.email
+        ]
+        with transaction.atomic():
+            UserAccount.objects.bulk_create([user for _, user in accepted])
+            EmailAddress.objects.bulk_create(addresses)
+        self.created += len(accepted)
+
+    def skip(self, line: int, reason):
+        self.skipped += 1
+        self.stderr.write(f"Row {line}: {reason}")
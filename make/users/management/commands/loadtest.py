@@ -0,0 +1,116 @@
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def connect(url, timeout: float):
+    connection_class = HTTPSConnection if url.scheme == "https" else HTTPConnection
+    return connection_class(url.netloc, timeout=timeout)
+
+
+def percentile(values: list, fraction: float):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent GET requests to a running server and report throughput "
+        "and latency, e.g. to compare WSGI and ASGI workers."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--header",
+            action="append",
+            default=[],
+            help="extra request header as 'Name: value' (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme not in ["http", "https"] or not url.netloc:
+            raise CommandError("URL must start with http:// or https://.")
+
+        headers = {}
+        for header in options["header"]:
+            name, _, value = header.partition(":")
+            headers[name.strip()] = value.strip()
+
+        total = options["requests"]
+        concurrency = max(1, min(options["concurrency"], total))
+        shares = [
+            total // concurrency + (1 if i < total % concurrency else 0)
+            for i in range(concurrency)
+        ]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(
+                executor.map(
+                    lambda count: self.send(url, headers, count, options["timeout"]),
+                    shares,
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for result, _ in results for latency in result]
+        statuses = sum((counts for _, counts in results), Counter())
+        self.report(total, concurrency, elapsed, latencies, statuses)
+
+    def send(self, url, headers: dict, count: int, timeout: float):
+        # Workers recycled by max_requests drop keep-alive connections, so retry
+        # once on a fresh connection the way browsers do.
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+
+        connection = connect(url, timeout)
+        latencies = []
+        statuses = Counter()
+        for _ in range(count):
+            start = time.perf_counter()
+            for attempt in range(2):
+                try:
+                    statuses[self.fetch(connection, path, headers)] += 1
+                    break
+                except (OSError, HTTPException):
+                    connection.close()
+                    connection = connect(url, timeout)
+                    if attempt:
+                        statuses["error"] += 1
+            latencies.append(time.perf_counter() - start)
+        connection.close()
+        return latencies, statuses
+
+    def fetch(self, connection, path: str, headers: dict):
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def report(self, total, concurrency, elapsed, latencies, statuses):
+        ms = [latency * 1000 for latency in latencies]
+        lines = [
+            f"requests     {total} ({concurrency} concurrent)",
+            f"throughput   {total / elapsed:.1f} requests/s",
+            f"latency      mean {statistics.fmean(ms):.1f} ms  "
+            f"p50 {percentile(ms, 0.5):.1f} ms  p90 {percentile(ms, 0.9):.1f} ms  "
+            f"p99 {percentile(ms, 0.99):.1f} ms  max {max(ms):.1f} ms",
+            "statuses     "
+            + "  ".join(
+                f"{status}: {n}" for status, n in sorted(statuses.items(), key=str)
+            ),
+        ]
+        self.stdout.write("\n".join(lines))
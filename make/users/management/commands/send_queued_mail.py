@@ -0,0 +1,44 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...mail import deliver
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued email in batches through EMAIL_DELIVERY_BACKEND, "
+        "retrying failed messages with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="deliver one batch and exit"
+        )
+
+    def handle(self, *args, **options):
+        stopping = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in [signal.SIGINT, signal.SIGTERM]:
+                signal.signal(signum, lambda *_: stopping.set())
+
+        batch_size = options["batch_size"]
+        while not stopping.is_set():
+            close_old_connections()
+            sent, failed = deliver(batch_size)
+            if sent or failed:
+                self.stdout.write(f"sent {sent}, failed {failed}")
+            if options["once"]:
+                break
+            if sent + failed < batch_size:
+                stopping.wait(options["interval"])
+        close_old_connections()
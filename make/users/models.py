@@ -1,21 +1,227 @@
+import hashlib
+import time
+
 from django.conf import settings
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, Group, Permission, UserManager
+from django.core.cache import cache, caches
+from django.db import models
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
 
+from .hashing import hash_password
 
-class UserAccount(AbstractUser):
+PERMISSIONS_ATTR = "_account_perm_cache"
+PERMISSIONS_VERSION_KEY = "users:permissions:version"
+
+
+def account_permissions_query(user):
+    meta = UserAccount._meta
+    return Permission.objects.filter(
+        Q(user=user.pk) | Q(group__user=user.pk),
+        content_type__app_label=meta.app_label,
+        content_type__model=meta.model_name,
+    )
+
+
+def permissions_version():
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSIONS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+def shared_permissions_key(user):
+    ttl = getattr(settings, "USER_PERMISSION_CACHE_TTL", 0)
+    if ttl:
+        return f"users:permissions:{user.pk}:{permissions_version()}", ttl
+    return None, None
+
+
+def cached_permissions(user):
+    if PERMISSIONS_ATTR not in user.__dict__:
+        key, _ = shared_permissions_key(user)
+        permissions = cache.get(key) if key else None
+        if permissions is None:
+            return None
+        user.__dict__[PERMISSIONS_ATTR] = permissions
+    return user.__dict__[PERMISSIONS_ATTR]
+
+
+def account_permissions(user):
+    permissions = cached_permissions(user)
+    if permissions is None:
+        codenames = account_permissions_query(user).values_list("codename", flat=True)
+        permissions = frozenset(codenames)
+        key, ttl = shared_permissions_key(user)
+        if key:
+            cache.set(key, permissions, ttl)
+        user.__dict__[PERMISSIONS_ATTR] = permissions
+    return permissions
+
+
+def has_account_perm(user, action: str):
+    if not user.is_active or user.is_anonymous:
+        return False
+    if user.is_superuser:
+        return True
+    codename = f"{action}_{UserAccount._meta.model_name}"
+    return codename in account_permissions(user)
+
+
+def invalidate_permissions(user=None):
+    if user is not None:
+        user.__dict__.pop(PERMISSIONS_ATTR, None)
+    try:
+        cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        cache.add(PERMISSIONS_VERSION_KEY, time.time_ns(), None)
+
+
+def token_cache():
+    return caches[getattr(settings, "TOKEN_CACHE_ALIAS", "default")]
+
+
+def token_cache_key(key: str):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"users:token:{digest}"
+
+
+def invalidate_tokens(keys):
+    token_cache().delete_many([token_cache_key(key) for key in keys])
+
+
+class UserAccountQuerySet(models.QuerySet):
+    def permitted(self, user, action: str):
+        if user.is_staff or (user.is_active and user.is_superuser):
+            return self.all()
+        elif not user.is_authenticated:
+            return self.none()
+        elif not user.is_active:
+            return self.filter(pk=user.pk)
+
+        allowed = has_account_perm(user, action)
+        return self.all() if allowed else self.filter(pk=user.pk)
+
+    def readable_by(self, user):
+        if settings.USER_DETAILS_PUBLIC:
+            return self.all()
+        return self.permitted(user, "view")
+
+    def deletable_by(self, user):
+        return self.permitted(user, "delete")
+
+
+class UserAccountManager(UserManager.from_queryset(UserAccountQuerySet)):
     pass
 
+
+class UserAccount(AbstractUser):
+    modified = models.DateTimeField(auto_now=True)
+
+    objects = UserAccountManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["is_active", "id"]),
+            models.Index(fields=["is_staff", "id"]),
+        ]
+
     def __str__(self):
         return self.username
 
+    def set_password(self, raw_password):
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
     def can_read(self, other):
         is_public = settings.USER_DETAILS_PUBLIC
-        is_auth = other.is_anonymous is False
-        has_perm = is_auth and other.has_perm("users.view_useraccount")
         is_self = other.id == self.id
-        return is_public or has_perm or other.is_staff or is_self
+        return is_public or other.is_staff or is_self or has_account_perm(other, "view")
 
     def can_delete(self, other):
-        has_perm = other.has_perm("users.delete_useraccount")
         is_self = other.id == self.id
-        return has_perm or other.is_staff or is_self
+        return other.is_staff or is_self or has_account_perm(other, "delete")
+
+
+class QueuedEmail(models.Model):
+    message = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    sent = models.DateTimeField(null=True, blank=True)
+    failed = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt", "id"],
+                condition=Q(sent__isnull=True, failed=False),
+                name="queued_email_due",
+            ),
+        ]
+
+    def __str__(self):
+        return self.message.get("subject", "")
+
+
+@receiver(m2m_changed, sender=UserAccount.groups.through)
+@receiver(m2m_changed, sender=UserAccount.user_permissions.through)
+def user_permissions_changed(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        user = instance if isinstance(instance, UserAccount) else None
+        invalidate_permissions(user)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_permissions()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permission_objects_changed(sender, **kwargs):
+    invalidate_permissions()
+
+
+def invalidate_user_tokens(users):
+    if getattr(settings, "TOKEN_CACHE_TTL", 0):
+        tokens = Token.objects.filter(user__in=users)
+        invalidate_tokens(tokens.values_list("key", flat=True))
+
+
+@receiver(post_save, sender=UserAccount)
+def user_account_saved(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    invalidate_user_tokens([instance.pk])
+
+
+@receiver(m2m_changed, sender=UserAccount.groups.through)
+@receiver(m2m_changed, sender=UserAccount.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def user_access_changed(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, UserAccount):
+        users = [instance.pk]
+    elif model is UserAccount:
+        users = pk_set if pk_set is not None else instance.user_set.all()
+    elif isinstance(instance, Group):
+        users = instance.user_set.all()
+    else:
+        groups = pk_set if pk_set is not None else instance.group_set.all()
+        users = UserAccount.objects.filter(groups__in=groups)
+    invalidate_user_tokens(users)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
@@ -1,7 +1,11 @@
 import pytest
-from django.contrib.auth.models import Permission
+from conftest import get_or_create_user
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
 from django.test import override_settings
 
+from .models import UserAccount, has_account_perm
+
 
 @pytest.mark.django_db
 class TestUserAccountConstructor:
@@ -63,3 +67,175 @@ def test_can_delete(get_user, verified_user, has_perm, expected):
         permission = Permission.objects.get(codename="delete_useraccount")
         get_user.user_permissions.add(permission)
     assert verified_user.can_delete(get_user) == expected
+
+
+def grant(user, codename, group=False):
+    permission = Permission.objects.get(codename=codename)
+    if group:
+        group, _ = Group.objects.get_or_create(name=codename)
+        group.permissions.add(permission)
+        user.groups.add(group)
+    else:
+        user.user_permissions.add(permission)
+
+
+@pytest.mark.django_db
+class TestReadableBy:
+    @pytest.mark.parametrize(
+        "get_user, public, expected",
+        [
+            ("anon", True, {"user", "other", "staff"}),
+            ("anon", False, set()),
+            ("other", True, {"user", "other", "staff"}),
+            ("other", False, {"other"}),
+            ("staff", False, {"user", "other", "staff"}),
+        ],
+        indirect=["get_user"],
+    )
+    def test_readable_by(self, get_user, verified_user, public, expected):
+        with override_settings(USER_DETAILS_PUBLIC=public):
+            users = UserAccount.objects.readable_by(get_user)
+            assert {user.username for user in users} == expected
+
+    @pytest.mark.parametrize("group", [False, True])
+    def test_permission(self, verified_user, verified_other, group):
+        grant(verified_other, "view_useraccount", group=group)
+        other = UserAccount.objects.get(pk=verified_other.pk)
+        users = UserAccount.objects.readable_by(other)
+        assert {user.username for user in users} == {"user", "other"}
+
+    def test_other_permission(self, verified_user, verified_other):
+        grant(verified_other, "delete_useraccount")
+        users = UserAccount.objects.readable_by(verified_other)
+        assert {user.username for user in users} == {"other"}
+
+    def test_superuser(self, verified_user, verified_other):
+        verified_other.is_superuser = True
+        users = UserAccount.objects.readable_by(verified_other)
+        assert {user.username for user in users} == {"user", "other"}
+
+    def test_inactive(self, verified_user, verified_other):
+        grant(verified_other, "view_useraccount")
+        verified_other.is_active = False
+        users = UserAccount.objects.readable_by(verified_other)
+        assert {user.username for user in users} == {"other"}
+
+    def test_permission_then_list(self, verified_other, django_assert_num_queries):
+        grant(verified_other, "view_useraccount", group=True)
+        other = UserAccount.objects.get(pk=verified_other.pk)
+        for i in range(10):
+            get_or_create_user(f"user{i}")
+        with django_assert_num_queries(2):
+            assert len(UserAccount.objects.readable_by(other)) == 11
+
+    def test_matches_can_read(self, verified_user, verified_other, verified_staff):
+        grant(verified_other, "view_useraccount")
+        for reader in UserAccount.objects.all():
+            readable = set(UserAccount.objects.readable_by(reader))
+            for user in UserAccount.objects.all():
+                assert (user in readable) == user.can_read(reader)
+
+
+@pytest.mark.django_db
+class TestDeletableBy:
+    @pytest.mark.parametrize(
+        "get_user, expected",
+        [
+            ("anon", set()),
+            ("user", {"user"}),
+            ("staff", {"user", "other", "staff"}),
+        ],
+        indirect=["get_user"],
+    )
+    def test_deletable_by(self, get_user, verified_user, expected):
+        users = UserAccount.objects.deletable_by(get_user)
+        assert {user.username for user in users} == expected
+
+    def test_ignores_public(self, verified_user, verified_other):
+        with override_settings(USER_DETAILS_PUBLIC=True):
+            users = UserAccount.objects.deletable_by(verified_other)
+            assert {user.username for user in users} == {"other"}
+
+    def test_permission(self, verified_user, verified_other):
+        grant(verified_other, "delete_useraccount", group=True)
+        users = UserAccount.objects.deletable_by(verified_other)
+        assert {user.username for user in users} == {"user", "other"}
+
+
+@pytest.mark.django_db
+def test_permission_memoized(verified_other, django_assert_num_queries):
+    grant(verified_other, "view_useraccount")
+    other = UserAccount.objects.get(pk=verified_other.pk)
+    users = [get_or_create_user(f"user{i}") for i in range(10)]
+    with django_assert_num_queries(1):
+        assert all(user.can_read(other) for user in users)
+    with django_assert_num_queries(1):
+        assert len(UserAccount.objects.readable_by(other)) == 11
+
+
+@pytest.mark.django_db
+class TestPermissionCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def reader(self, verified_other):
+        grant(verified_other, "view_useraccount")
+        return UserAccount.objects.get(pk=verified_other.pk)
+
+    def test_loads_once(self, reader, verified_user, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert verified_user.can_read(reader)
+            assert not verified_user.can_delete(reader)
+
+    def test_invalidated_on_grant(self, reader, verified_user):
+        assert not verified_user.can_delete(reader)
+        grant(reader, "delete_useraccount")
+        assert verified_user.can_delete(reader)
+
+    @override_settings(USER_PERMISSION_CACHE_TTL=60)
+    def test_shared(self, reader, verified_user, django_assert_num_queries):
+        verified_user.can_read(reader)
+        fresh = UserAccount.objects.get(pk=reader.pk)
+        with django_assert_num_queries(0):
+            assert verified_user.can_read(fresh)
+
+    def test_not_shared_by_default(
+        self, reader, verified_user, django_assert_num_queries
+    ):
+        verified_user.can_read(reader)
+        fresh = UserAccount.objects.get(pk=reader.pk)
+        with django_assert_num_queries(1):
+            assert verified_user.can_read(fresh)
+
+    @override_settings(USER_PERMISSION_CACHE_TTL=60)
+    def test_shared_invalidated_by_group(self, reader, verified_user):
+        group = Group.objects.create(name="deleters")
+        reader.groups.add(group)
+        assert not verified_user.can_delete(reader)
+        group.permissions.add(Permission.objects.get(codename="delete_useraccount"))
+        fresh = UserAccount.objects.get(pk=reader.pk)
+        assert verified_user.can_delete(fresh)
+
+    @override_settings(USER_PERMISSION_CACHE_TTL=60)
+    def test_shared_invalidated_by_revoke(self, reader, verified_user):
+        assert verified_user.can_read(reader)
+        permission = Permission.objects.get(codename="view_useraccount")
+        reader.user_permissions.remove(permission)
+        fresh = UserAccount.objects.get(pk=reader.pk)
+        assert not verified_user.can_read(fresh)
+
+    def test_queries_permissions_directly(self, reader, django_assert_num_queries):
+        with django_assert_num_queries(1) as captured:
+            assert has_account_perm(reader, "view")
+        sql = captured.captured_queries[0]["sql"]
+        assert 'FROM "auth_permission"' in sql
+        assert "EXISTS" not in sql
+
+    def test_queryset_uses_cache(self, reader):
+        has_account_perm(reader, "view")
+        users = UserAccount.objects.readable_by(reader)
+        assert "EXISTS" not in str(users.query)
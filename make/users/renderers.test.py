@@ -0,0 +1,117 @@
+import datetime
+import decimal
+import io
+import uuid
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from . import renderers
+from .models import UserAccount
+from .renderers import ORJSONParser, ORJSONRenderer
+from .serializers import UserSerializer
+
+payloads = [
+    {"id": 1, "username": "user", "is_active": True, "is_staff": False},
+    [{"nested": {"list": [1, 2.5, None, True]}}, "ünïcödé", "emoji 🎉"],
+    {"separators": "line\u2028paragraph\u2029end"},
+    {"when": datetime.datetime(2023, 10, 18, 12, 30, 15, 123456)},
+    {"when": datetime.datetime(2023, 10, 18, tzinfo=datetime.timezone.utc)},
+    {"day": datetime.date(2023, 10, 18), "time": datetime.time(12, 30, 15, 500)},
+    {"amount": decimal.Decimal("12.50"), "id": uuid.UUID(int=1)},
+    {"lazy": gettext_lazy("This field is required.")},
+    {"duration": datetime.timedelta(days=1, seconds=5)},
+    {"big": 2**70},
+]
+
+
+@pytest.mark.parametrize("data", payloads)
+def test_render_identical(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_render_floats_equivalent():
+    data = {"small": 1e-7, "large": 1.5e300, "plain": 0.1}
+    parsed = JSONParser().parse(io.BytesIO(ORJSONRenderer().render(data)))
+    assert parsed == data
+
+
+@pytest.mark.parametrize(
+    "value", [float("nan"), float("inf"), -float("inf"), decimal.Decimal("NaN")]
+)
+def test_render_non_finite_rejected(value):
+    data = {"scores": [1.0, value]}
+    with pytest.raises(ValueError, match="not JSON compliant"):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError, match="not JSON compliant"):
+        ORJSONRenderer().render(data)
+
+
+def test_render_non_finite_not_strict():
+    class Renderer(ORJSONRenderer):
+        strict = False
+
+    data = {"score": float("nan"), "missing": None}
+    assert Renderer().render(data) == b'{"score":NaN,"missing":null}'
+
+
+def test_render_indent_identical():
+    data = payloads[0]
+    media_type = "application/json; indent=4"
+    expected = JSONRenderer().render(data, media_type)
+    assert ORJSONRenderer().render(data, media_type) == expected
+
+
+def test_render_none():
+    assert ORJSONRenderer().render(None) == b""
+
+
+@pytest.mark.parametrize("data", payloads)
+def test_render_without_orjson(monkeypatch, data):
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_render_users_identical(verified_user, verified_staff):
+    data = UserSerializer(UserAccount.objects.all(), many=True).data
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize(
+    "body", [b'{"username": "\\u00fcser", "ids": [1, 2.5, null]}', b"[]", b'"text"']
+)
+def test_parse_equivalent(body):
+    expected = JSONParser().parse(io.BytesIO(body))
+    assert ORJSONParser().parse(io.BytesIO(body)) == expected
+
+
+def test_parse_invalid():
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(b"{nope"))
+
+
+def test_parse_other_encoding():
+    body = '{"username": "üser"}'.encode("latin-1")
+    context = {"encoding": "latin-1"}
+    assert ORJSONParser().parse(io.BytesIO(body), parser_context=context) == {
+        "username": "üser"
+    }
+
+
+def test_parse_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert ORJSONParser().parse(io.BytesIO(b'{"a": 1}')) == {"a": 1}
+
+
+@pytest.mark.django_db
+def test_bench_json(verified_staff):
+    stdout = StringIO()
+    call_command("bench_json", users=5, number=1, endpoint=True, stdout=stdout)
+    assert "list orjson" in stdout.getvalue()
+    assert "GET list ORJSONRenderer" in stdout.getvalue()
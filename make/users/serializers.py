@@ -1,9 +1,85 @@
-from rest_framework import serializers
+from collections import namedtuple
+from functools import lru_cache
+
+from rest_framework import fields, serializers
 
 from .models import UserAccount
 
+FastRepresentation = namedtuple("FastRepresentation", ["instance", "row", "sources"])
+COMPLEX_FIELDS = (
+    serializers.BaseSerializer,
+    serializers.ManyRelatedField,
+    serializers.RelatedField,
+    serializers.SerializerMethodField,
+)
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserAccount
         fields = ("id", "username", "is_active", "is_staff")
+
+
+def converter(field):
+    if type(field) is fields.IntegerField:
+        return int
+    elif type(field) is fields.CharField:
+        return str
+    return field.to_representation
+
+
+@lru_cache(maxsize=None)
+def compile_representation(serializer_class):
+    if (
+        serializer_class.to_representation
+        is not serializers.Serializer.to_representation
+    ):
+        return None
+
+    readable = [
+        field for field in serializer_class().fields.values() if not field.write_only
+    ]
+    for field in readable:
+        simple_source = field.source_attrs == [field.source]
+        if not simple_source or not field.source.isidentifier():
+            return None
+        if isinstance(field, COMPLEX_FIELDS):
+            return None
+
+    namespace = {f"convert_{i}": converter(field) for i, field in enumerate(readable)}
+    functions = {"instance": "obj.{source}", "row": "obj[{source!r}]"}
+    for name, access in functions.items():
+        items = [
+            f"        {field.field_name!r}: None if (value_{i} := "
+            f"{access.format(source=field.source)}) is None "
+            f"else convert_{i}(value_{i}),"
+            for i, field in enumerate(readable)
+        ]
+        code = "\n".join([f"def {name}(obj):", "    return {", *items, "    }"])
+        exec(code, namespace)
+
+    sources = tuple(field.source for field in readable)
+    return FastRepresentation(namespace["instance"], namespace["row"], sources)
+
+
+def represent(serializer_class, obj):
+    compiled = compile_representation(serializer_class)
+    if compiled is None:
+        return serializer_class(obj).data
+    elif isinstance(obj, dict):
+        return compiled.row(obj)
+    return compiled.instance(obj)
+
+
+def represent_many(serializer_class, objs):
+    compiled = compile_representation(serializer_class)
+    if compiled is None:
+        return serializer_class(objs, many=True).data
+    return [represent(serializer_class, obj) for obj in objs]
+
+
+def values_for(serializer_class, queryset):
+    compiled = compile_representation(serializer_class)
+    if compiled is None:
+        return queryset
+    return queryset.values(*compiled.sources)
@@ -1,7 +1,18 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
 
 from .models import UserAccount
-from .serializers import UserSerializer
+from .serializers import (
+    UserSerializer,
+    compile_representation,
+    represent,
+    represent_many,
+    values_for,
+)
 
 
 @pytest.fixture
@@ -55,3 +66,82 @@ class TestUserSerializerDeserialization:
         serializer = UserSerializer(data=data)
         assert not serializer.is_valid()
         assert "username" in serializer.errors
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+class TestFastRepresentation:
+    @pytest.fixture
+    def users(self, verified_user, verified_staff):
+        verified_staff.is_active = False
+        verified_staff.save()
+        return UserAccount.objects.order_by("id")
+
+    def test_compiles(self):
+        compiled = compile_representation(UserSerializer)
+        assert compiled.sources == ("id", "username", "is_active", "is_staff")
+
+    def test_instance_identical(self, users):
+        for user in users:
+            assert render(represent(UserSerializer, user)) == render(
+                UserSerializer(user).data
+            )
+
+    def test_row_identical(self, users):
+        rows = values_for(UserSerializer, users)
+        expected = render(UserSerializer(users, many=True).data)
+        assert render(represent_many(UserSerializer, rows)) == expected
+
+    def test_none(self):
+        user = UserAccount(id=None, username="unsaved")
+        assert render(represent(UserSerializer, user)) == render(
+            UserSerializer(user).data
+        )
+
+    def test_skips_write_only(self, verified_user):
+        class PasswordSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = UserAccount
+                fields = ("id", "password")
+                extra_kwargs = {"password": {"write_only": True}}
+
+        assert represent(PasswordSerializer, verified_user) == {"id": verified_user.id}
+
+    @pytest.mark.parametrize(
+        "field",
+        [
+            serializers.SerializerMethodField(),
+            serializers.CharField(source="_meta.label"),
+            serializers.CharField(source="*"),
+        ],
+    )
+    def test_falls_back(self, verified_user, field):
+        class ExtraSerializer(UserSerializer):
+            extra = field
+
+            class Meta(UserSerializer.Meta):
+                fields = UserSerializer.Meta.fields + ("extra",)
+
+            def get_extra(self, obj):
+                return "extra"
+
+        assert compile_representation(ExtraSerializer) is None
+        rows = values_for(ExtraSerializer, UserAccount.objects.all())
+        assert isinstance(rows.first(), UserAccount)
+        represent(ExtraSerializer, verified_user)
+
+    def test_custom_to_representation(self):
+        class CustomSerializer(UserSerializer):
+            def to_representation(self, instance):
+                return {}
+
+        assert compile_representation(CustomSerializer) is None
+
+
+def test_bench_serializers():
+    stdout = StringIO()
+    call_command("bench_serializers", users=10, number=1, stdout=stdout)
+    assert "fast (rows)" in stdout.getvalue()
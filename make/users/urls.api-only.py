@@ -2,18 +2,24 @@ from dj_rest_auth.registration.views import VerifyEmailView
 from django.conf import settings
 from django.urls import path
 
-from .views import PasswordResetPostView, SessionAPIView, UserAPIView, UserDetailAPIView
+from . import async_views, views
+from .views import PasswordResetPostView
 
 API_BASE = settings.API_BASE
 users_api = f"{API_BASE}users/"
 session_api = f"{API_BASE}session/"
 verify_api = f"{API_BASE}verification/"
 reset_api = f"{API_BASE}password-reset/"
+api_views = async_views if settings.ASYNC_API_VIEWS else views
 
 urlpatterns = [
-    path(users_api, UserAPIView.as_view(), name="user_coll_api"),
-    path(f"{users_api}<int:pk>/", UserDetailAPIView.as_view(), name="user_detail_api"),
-    path(session_api, SessionAPIView.as_view(), name="session_api"),
+    path(users_api, api_views.UserAPIView.as_view(), name="user_coll_api"),
+    path(
+        f"{users_api}<int:pk>/",
+        api_views.UserDetailAPIView.as_view(),
+        name="user_detail_api",
+    ),
+    path(session_api, api_views.SessionAPIView.as_view(), name="session_api"),
     path(
         f"{verify_api}",
         VerifyEmailView.as_view(),
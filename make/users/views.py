@@ -2,27 +2,38 @@ from dj_rest_auth.registration.views import RegisterView
 from dj_rest_auth.views import LoginView as APILoginView
 from dj_rest_auth.views import LogoutView as APILogoutView
 from dj_rest_auth.views import PasswordResetConfirmView, PasswordResetView
+from django.conf import settings
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.views import LoginView
 from django.http import Http404, JsonResponse
 from django.urls import reverse_lazy
 from django.views import View
 from django.views.generic.edit import CreateView
-from rest_framework.exceptions import NotAuthenticated, PermissionDenied
+from rest_framework.exceptions import (
+    NotAuthenticated,
+    PermissionDenied,
+    ValidationError,
+)
+from rest_framework.fields import BooleanField
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .caching import CachedDetailMixin
 from .forms import UserAccountCreationForm
 from .models import UserAccount
-from .serializers import UserSerializer
+from .serializers import UserSerializer, represent, represent_many, values_for
 
 
 class UserRegisterAPIView(RegisterView):
     def get_response_data(self, user):
-        return UserSerializer(user).data
+        return represent(UserSerializer, user)
 
 
-class UserDetailAPIView(APIView):
+class UserDetailAPIView(CachedDetailMixin, APIView):
+    model = UserAccount
+    serializer_class = UserSerializer
+
     def get_object(self, pk):
         try:
             return UserAccount.objects.get(pk=pk)
@@ -30,11 +41,10 @@ class UserDetailAPIView(APIView):
             raise Http404
 
     def get(self, request, pk):
-        user = self.get_object(pk)
+        user = self.get_version(pk)
 
         if user.can_read(request.user):
-            serializer = UserSerializer(user)
-            return Response(serializer.data)
+            return self.cached_response(request, user)
         elif not request.user.is_authenticated:
             raise NotAuthenticated
         else:
@@ -46,15 +56,31 @@ class UserDetailAPIView(APIView):
         if user.can_delete(request.user):
             user.is_active = False
             user.save()
-            serializer = UserSerializer(user)
-            return Response(serializer.data)
+            return Response(represent(UserSerializer, user))
         elif not request.user.is_authenticated:
             raise NotAuthenticated
         else:
             raise PermissionDenied
 
 
+class UserCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
 class UserAPIView(APIView):
+    filter_fields = ("is_active", "is_staff")
+
+    def get(self, request, *args, **kwargs):
+        users = readable_users(request.user)
+        users = filter_users(users, request.query_params, self.filter_fields)
+        paginator = UserCursorPagination()
+        rows = values_for(UserSerializer, users)
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(represent_many(UserSerializer, page))
+
     def post(self, request, *args, **kwargs):
         view = prepare_view(UserRegisterAPIView(), self)
         return view.post(request, *args, **kwargs)
@@ -97,6 +123,28 @@ class PasswordResetPostView(View):
             return JsonResponse({"error": msg}, status=400)
 
 
+def readable_users(user):
+    if not user.is_authenticated and not settings.USER_DETAILS_PUBLIC:
+        raise NotAuthenticated
+    return UserAccount.objects.readable_by(user)
+
+
+def filter_users(users, params, fields):
+    errors = {}
+    for field in fields:
+        if field not in params:
+            continue
+        try:
+            value = BooleanField().to_internal_value(params[field])
+        except ValidationError as error:
+            errors[field] = error.detail
+        else:
+            users = users.filter(**{field: value})
+    if errors:
+        raise ValidationError(errors)
+    return users
+
+
 def prepare_view(view, context):
     view.request = context.request
     view.format_kwarg = context.format_kwarg
@@ -3,8 +3,17 @@ import re
 import pytest
 from allauth.account.models import EmailAddress, EmailConfirmation
 from django.conf import settings
+from django.contrib.auth.models import Permission
 from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from users import caching
+from users.caching import serializer_fingerprint
+from users.models import UserAccount
+from users.serializers import UserSerializer
 
 
 def test_register_view(anon_client):
@@ -30,6 +39,93 @@ def test_user_detail(get_client, verified_user, expected):
         assert response.data["is_staff"] == verified_user.is_staff
 
 
+@pytest.mark.django_db
+class TestUserDetailCaching:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def endpoint(self, verified_user):
+        return f"/{settings.API_BASE}users/{verified_user.id}/"
+
+    @pytest.fixture
+    def no_serialization(self, monkeypatch):
+        def fail(*args, **kwargs):
+            pytest.fail("serialized a cached user")
+
+        monkeypatch.setattr(UserSerializer, "to_representation", fail)
+        monkeypatch.setattr(caching, "represent", fail)
+
+    def test_headers(self, user_client, endpoint):
+        client, _ = user_client
+        response = client.get(endpoint)
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('"')
+        assert "Last-Modified" in response.headers
+        assert "private" in response.headers["Cache-Control"]
+
+    def test_if_none_match(self, user_client, endpoint, request):
+        client, _ = user_client
+        etag = client.get(endpoint).headers["ETag"]
+        request.getfixturevalue("no_serialization")
+        response = client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+    def test_if_modified_since_ignored(self, user_client, endpoint):
+        client, user = user_client
+        last_modified = client.get(endpoint).headers["Last-Modified"]
+        user.username = "renamed"
+        user.save()
+        response = client.get(endpoint, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200
+        assert response.data["username"] == "renamed"
+
+    def test_cached_payload(self, user_client, endpoint, request):
+        client, _ = user_client
+        expected = client.get(endpoint).data
+        request.getfixturevalue("no_serialization")
+        response = client.get(endpoint)
+        assert response.status_code == 200
+        assert response.data == expected
+
+    def test_changes_on_save(self, user_client, endpoint):
+        client, user = user_client
+        etag = client.get(endpoint).headers["ETag"]
+        user.username = "renamed"
+        user.save()
+        response = client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["username"] == "renamed"
+
+    def test_changes_on_delete(self, staff_client, endpoint):
+        client, _ = staff_client
+        etag = client.get(endpoint).headers["ETag"]
+        client.delete(endpoint)
+        response = client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["is_active"] is False
+
+    def test_permission_before_cache(self, user_client, other_client, endpoint):
+        client, _ = user_client
+        etag = client.get(endpoint).headers["ETag"]
+        client, _ = other_client
+        response = client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 403
+
+
+def test_serializer_fingerprint():
+    class RenamedSerializer(UserSerializer):
+        class Meta(UserSerializer.Meta):
+            fields = ("id", "username")
+
+    original = serializer_fingerprint(UserSerializer)
+    assert serializer_fingerprint(RenamedSerializer) != original
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "get_client, expected",
@@ -47,6 +143,110 @@ def test_user_delete(get_client, verified_user, expected):
         assert response.data["is_staff"] == verified_user.is_staff
 
 
+@pytest.mark.django_db
+class TestUserList:
+    endpoint = f"/{settings.API_BASE}users/"
+
+    def usernames(self, response):
+        return sorted(user["username"] for user in response.data["results"])
+
+    def test_anonymous(self, anon_client):
+        client, _ = anon_client
+        response = client.get(self.endpoint)
+        assert response.data["detail"].code == "not_authenticated"
+
+    def test_public(self, anon_client, verified_user):
+        client, _ = anon_client
+        with override_settings(USER_DETAILS_PUBLIC=True):
+            response = client.get(self.endpoint)
+        assert response.status_code == 200
+        assert self.usernames(response) == ["user"]
+
+    def test_self_only(self, other_client, verified_user):
+        client, _ = other_client
+        response = client.get(self.endpoint)
+        assert response.status_code == 200
+        assert self.usernames(response) == ["other"]
+
+    def test_staff(self, staff_client, verified_user, verified_other):
+        client, _ = staff_client
+        response = client.get(self.endpoint)
+        assert response.status_code == 200
+        assert self.usernames(response) == ["other", "staff", "user"]
+
+    def test_permission(self, other_client, verified_user):
+        client, other = other_client
+        permission = Permission.objects.get(codename="view_useraccount")
+        other.user_permissions.add(permission)
+        response = client.get(self.endpoint)
+        assert self.usernames(response) == ["other", "user"]
+
+    @pytest.mark.parametrize("granted", [False, True])
+    def test_list_query_is_a_range_scan(self, other_client, verified_user, granted):
+        client, other = other_client
+        if granted:
+            permission = Permission.objects.get(codename="view_useraccount")
+            other.user_permissions.add(permission)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(self.endpoint)
+        listed = [
+            query["sql"]
+            for query in queries
+            if 'FROM "users_useraccount"' in query["sql"] and "ORDER BY" in query["sql"]
+        ]
+        assert len(listed) == 1
+        assert "EXISTS" not in listed[0]
+        assert " OR " not in listed[0]
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("is_staff=true", ["staff"]),
+            ("is_staff=false", ["other", "user"]),
+            ("is_active=false", ["other"]),
+            ("is_active=true&is_staff=false", ["user"]),
+        ],
+    )
+    def test_filters(
+        self, staff_client, verified_user, verified_other, query, expected
+    ):
+        client, _ = staff_client
+        verified_other.is_active = False
+        verified_other.save()
+        response = client.get(f"{self.endpoint}?{query}")
+        assert self.usernames(response) == expected
+
+    def test_invalid_filter(self, staff_client):
+        client, _ = staff_client
+        response = client.get(f"{self.endpoint}?is_staff=maybe")
+        assert response.status_code == 400
+        assert "is_staff" in response.data
+
+    def test_pages(self, staff_client, verified_user, verified_other):
+        client, _ = staff_client
+        first = client.get(f"{self.endpoint}?page_size=2")
+        assert len(first.data["results"]) == 2
+        assert first.data["previous"] is None
+        second = client.get(first.data["next"])
+        assert len(second.data["results"]) == 1
+        assert second.data["next"] is None
+        usernames = self.usernames(first) + self.usernames(second)
+        assert sorted(usernames) == ["other", "staff", "user"]
+
+    def test_ordered_by_id(self, staff_client, verified_user, verified_other):
+        client, _ = staff_client
+        response = client.get(self.endpoint)
+        ids = [user["id"] for user in response.data["results"]]
+        assert ids == sorted(ids)
+
+    def test_constant_queries(self, staff_client, django_assert_max_num_queries):
+        client, _ = staff_client
+        for i in range(20):
+            UserAccount.objects.create(username=f"user{i}", email=f"{i}@testing.com")
+        with django_assert_max_num_queries(4):
+            client.get(self.endpoint)
+
+
 @pytest.mark.django_db
 def test_user_api_create(anon_client):
     client, _ = anon_client